@@ -1,43 +1,38 @@
 import streamlit as st
 import requests
 from streamlit_chat import message
-import json
-import os
 from PIL import Image
 import pytesseract
-
-pytesseract.pytesseract.tesseract_cmd = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
+from history_store import HistoryStore
+from context_window import fit_messages
+from ocr_engines import get_router
 
 OLLAMA_API_URL = "http://localhost:11434/api/chat"
-HISTORY_FILE = "chat_history.json"
+MODEL_NAME = "llama2:latest"
+HISTORY_FILE = "chat_history.jsonl"
+LEGACY_HISTORY_FILE = "chat_history.json"  # old format, migrated to HISTORY_FILE on first run
+HISTORY_PAGE_SIZE = 20
+RECENT_TURNS = 20  # saved turns restored into a new session
 
-if os.path.exists(HISTORY_FILE):
-    try:
-        with open(HISTORY_FILE, "r", encoding="utf-8") as f:
-            saved_history = json.load(f)
-    except json.JSONDecodeError:
-        saved_history = []
-else:
-    saved_history = []
 
-if "user_input" not in st.session_state:
-    st.session_state["user_input"] = []
-if "ollama_response" not in st.session_state:
-    st.session_state["ollama_response"] = []
+@st.cache_resource
+def get_history_store():
+    # One store per server process, shared across sessions and reruns
+    return HistoryStore(HISTORY_FILE, legacy_path=LEGACY_HISTORY_FILE)
 
-for item in saved_history:
-    if isinstance(item, dict):
-        if "user" in item and "bot" in item:
-            st.session_state["user_input"].append(item["user"])
-            st.session_state["ollama_response"].append(item["bot"])
-        elif item.get("role") == "user":
-            st.session_state["user_input"].append(item.get("content", ""))
-        elif item.get("role") == "assistant":
-            st.session_state["ollama_response"].append(item.get("content", ""))
+
+history = get_history_store()
+
+if "user_input" not in st.session_state:
+    recent_turns = history.recent(RECENT_TURNS)
+    st.session_state["user_input"] = [t.get("user", "") for t in recent_turns]
+    st.session_state["ollama_response"] = [t.get("bot", "") for t in recent_turns]
+if "history_page" not in st.session_state:
+    st.session_state["history_page"] = 0
 
 def ollama_chat(messages):
     payload = {
-        "model": "llama2:latest",
+        "model": MODEL_NAME,
         "messages": messages,
         "stream": False
     }
@@ -88,18 +83,32 @@ if st.sidebar.button("🗑️ Clear Chat"):
     st.session_state["ollama_response"] = []
 
 if st.sidebar.button("🧹 Clear History"):
-    if os.path.exists(HISTORY_FILE):
-        os.remove(HISTORY_FILE)
+    history.clear()
     st.session_state["user_input"] = []
     st.session_state["ollama_response"] = []
+    st.session_state["history_page"] = 0
 
-# --- Show past chats in sidebar ---
-for i, (u, b) in enumerate(zip(st.session_state["user_input"], st.session_state["ollama_response"])):
+# --- Show past chats in sidebar (one page at a time, newest first) ---
+page_count = max(1, -(-len(history) // HISTORY_PAGE_SIZE))
+st.session_state["history_page"] = min(st.session_state["history_page"], page_count - 1)
+
+for i, turn in history.page(st.session_state["history_page"], HISTORY_PAGE_SIZE):
+    u, b = turn.get("user", ""), turn.get("bot", "")
     one_liner = u if len(u) <= 40 else u[:37] + "..."
     with st.sidebar.expander(f"{i + 1}. {one_liner}", expanded=False):
         st.markdown(f"**You:** {u}")
         st.markdown(f"**Bot:** {b}")
 
+if page_count > 1:
+    prev_col, label_col, next_col = st.sidebar.columns([1, 2, 1])
+    if prev_col.button("◀", disabled=st.session_state["history_page"] >= page_count - 1):
+        st.session_state["history_page"] += 1
+        st.rerun()
+    label_col.markdown(f"Page {st.session_state['history_page'] + 1} / {page_count}")
+    if next_col.button("▶", disabled=st.session_state["history_page"] == 0):
+        st.session_state["history_page"] -= 1
+        st.rerun()
+
 # --- Centered input area with icons ---
 st.markdown("<br>", unsafe_allow_html=True)
 st.markdown("<div style='text-align:center;'>", unsafe_allow_html=True)
@@ -116,7 +125,7 @@ if uploaded_file is not None:
 
     try:
         with st.spinner("🔍 Extracting text from image..."):
-            ocr_text = pytesseract.image_to_string(image)
+            ocr_text = get_router().recognize(image).text
 
         if ocr_text.strip():
             st.success("✅ Text extracted successfully!")
@@ -147,6 +156,8 @@ if user_input:
         conversation.append({"role": "assistant", "content": b})
 
     conversation.append({"role": "user", "content": user_input})
+    # Only the system prompt and the most recent turns that fit the model's context are sent
+    conversation = fit_messages(conversation, model=MODEL_NAME)
 
     with st.spinner("🤖 Generating response..."):
         bot_response = ollama_chat(conversation).strip()
@@ -154,12 +165,7 @@ if user_input:
     st.session_state["user_input"].append(user_input)
     st.session_state["ollama_response"].append(bot_response)
 
-    chat_data = [
-        {"user": u, "bot": b}
-        for u, b in zip(st.session_state["user_input"], st.session_state["ollama_response"])
-    ]
-    with open(HISTORY_FILE, "w", encoding="utf-8") as f:
-        json.dump(chat_data, f, ensure_ascii=False, indent=4)
+    history.append(user_input, bot_response)
 
 # --- Display chat messages (ChatGPT-like flow) ---
 if st.session_state["user_input"]:
@@ -3,19 +3,46 @@ import requests
 import json
 import uuid
 import time
-import pytesseract
 from PIL import Image
-import base64
-from io import BytesIO
 import re
+from context_window import ContextWindow, ollama_summarizer
+from response_cache import ResponseCache, request_key
+from stream_render import StreamRenderer
+from ollama_status import OllamaProbe, model_available
+from model_manager import get_manager
+from blob_store import BlobStore
+from ocr_engines import get_router
 
-# --- ✅ Correct Tesseract path (Windows) ---
-pytesseract.pytesseract.tesseract_cmd = r"C:\\Program Files\\Tesseract-OCR\\tesseract.exe"
+# --- Models: preloaded at startup (see model_manager.get_manager) ---
+MODELS = ["phi3", "mistral", "llama2"]
 
 # --- Page Config ---
 st.set_page_config(page_title="💬 ChatGPT Clone", page_icon="💬", layout="wide")
 st.title("💬 Chat with Ollama")
 
+# --- Response cache shared by all sessions (opt-in from the sidebar) ---
+@st.cache_resource
+def get_response_cache():
+    return ResponseCache(max_entries=256, ttl=3600)
+
+
+response_cache = get_response_cache()
+
+
+# --- Uploaded images live here; messages only hold a reference ---
+@st.cache_resource
+def get_blob_store():
+    return BlobStore("blobs")
+
+
+blob_store = get_blob_store()
+
+
+# --- Ollama liveness probe: one per server URL, shared by all sessions and reruns ---
+@st.cache_resource
+def get_ollama_probe(base_url):
+    return OllamaProbe(base_url, ttl=30)
+
 # --- Initialize session state ---
 if "conversations" not in st.session_state:
     st.session_state["conversations"] = {}
@@ -35,10 +62,32 @@ if "show_uploader" not in st.session_state:
 # --- Sidebar ---
 with st.sidebar:
     st.markdown("### ⚙️ Settings")
-    model = st.selectbox("Choose a model", ["phi3", "mistral", "llama2"])
     # Allow configuring Ollama endpoint (useful if Ollama is running on a different port)
     ollama_url = st.text_input("Ollama URL", value="http://localhost:11434")
+    model_manager = get_manager(ollama_url, preload=MODELS)
+    # Warm models answer right away; a cold one is loaded by the first request
+    model = st.selectbox("Choose a model", MODELS, format_func=model_manager.label)
+    ollama_probe = get_ollama_probe(ollama_url)
+    ollama_status = ollama_probe.status()
+    if not ollama_status["ok"]:
+        st.error(f"🔴 Can't reach Ollama at {ollama_url}")
+        if st.button("🔄 Retry connection"):
+            ollama_probe.invalidate()
+            st.rerun()
+    elif not model_available(model, ollama_status["models"]):
+        st.warning(f"🟡 Ollama is up, but `{model}` isn't pulled (ollama pull {model})")
+    else:
+        st.caption(f"🟢 Ollama is up · {model} available")
     dev_mode = st.checkbox("Developer: show sanitized payload", value=False)
+    summarize_old = st.checkbox("Summarize older turns", value=False,
+                                help="When a chat outgrows the model's context, fold dropped turns into a summary")
+    use_cache = st.checkbox("Reuse answers for identical requests", value=False,
+                            help="Explain/Summarize/Translate on the same content returns the cached reply")
+    bypass_cache = st.checkbox("Bypass cache (fresh answer)", value=False, disabled=not use_cache)
+    if use_cache:
+        cache_stats = response_cache.stats()
+        st.caption(f"🗄️ Cache: {cache_stats['hits']} hits · {cache_stats['misses']} misses · "
+                   f"{cache_stats['entries']} entries")
 
     if st.button("➕ New Chat"):
         chat_id = str(uuid.uuid4())
@@ -122,6 +171,10 @@ current_chat = st.session_state["conversations"][current_chat_id]
 st.markdown("<div class='chat-container'>", unsafe_allow_html=True)
 for i, msg in enumerate(current_chat["messages"]):
     bubble_class = f"chat-bubble {msg['role']}"
+    for ref in msg.get("images", []):
+        # Served by Streamlit's media endpoint instead of being inlined into the page
+        if blob_store.exists(ref):
+            st.image(blob_store.path(ref), width=200)
     st.markdown(f"<div class='{bubble_class}'>{msg['content']}</div>", unsafe_allow_html=True)
 
     if msg["role"] in ["assistant", "document"] and i == len(current_chat["messages"]) - 1:
@@ -146,16 +199,13 @@ st.markdown("</div>", unsafe_allow_html=True)
 if st.session_state.get("show_uploader"):
     uploaded_image = st.file_uploader("📤 Upload image for OCR", type=["png", "jpg", "jpeg"])
     if uploaded_image:
+        image_bytes = uploaded_image.getvalue()
         image = Image.open(uploaded_image)
-
-        # Convert image to base64 string
-        buffered = BytesIO()
-        image.save(buffered, format="PNG")
-        img_str = base64.b64encode(buffered.getvalue()).decode()
-        img_html = f"<img src='data:image/png;base64,{img_str}' width='200'>"
+        # Store the original upload once; the message keeps just the reference
+        image_ref = blob_store.put(image_bytes, ext=(image.format or "png").lower())
 
         try:
-            extracted_text = pytesseract.image_to_string(image)
+            extracted_text = get_router().recognize(image).text
 
             # --- Clean OCR result: remove stray newlines, collapse spaces, and fix uppercase splits ---
             def clean_ocr_text(s: str) -> str:
@@ -174,14 +224,15 @@ if st.session_state.get("show_uploader"):
                 return text.strip()
 
             extracted_text = clean_ocr_text(extracted_text)
-            chat_content = f"🖼️ {img_html}<br>"
+            chat_content = "🖼️ Uploaded image"
             if extracted_text:
                 # Use a plain paragraph for extracted text to avoid nested scrolls in some browsers
-                chat_content += f"🧾 **Extracted Text:**<br>{extracted_text}"
+                chat_content += f"<br>🧾 **Extracted Text:**<br>{extracted_text}"
 
             current_chat["messages"].append({
                 "role": "document",
-                "content": chat_content
+                "content": chat_content,
+                "images": [image_ref]
             })
 
             st.session_state["show_uploader"] = False
@@ -189,6 +240,26 @@ if st.session_state.get("show_uploader"):
         except Exception as e:
             st.error(f"❌ OCR Error: {e}")
 
+# --- Model-ready form of a message, computed once and kept next to it ---
+HTML_TAG_RE = re.compile(r"<[^>]+>")
+
+
+def payload_message(m):
+    """
+    {role, content} with HTML stripped. Cached on the message as ("_payload", source content);
+    the cache is rebuilt only if the message's role or content object has been replaced.
+    """
+    cached = m.get("_payload")
+    if cached is None or cached[0] is not m.get("content") or cached[1]["role"] != m["role"]:
+        content = m.get("content")
+        if isinstance(content, str):
+            # strip simple HTML tags so the model receives plain text
+            content = HTML_TAG_RE.sub("", content)
+        cached = (m.get("content"), {"role": m["role"], "content": content})
+        m["_payload"] = cached
+    return cached[1]
+
+
 # --- Determine prompt ---
 prompt = None
 if st.session_state.get("pending_prompt"):
@@ -208,78 +279,82 @@ if prompt:
     placeholder = st.empty()
     placeholder.markdown("<div class='chat-bubble assistant typing-cursor'>🤖 Thinking...</div>", unsafe_allow_html=True)
 
-    full_reply = ""
     start_time = time.time()
+
+    def render(text, final):
+        # Typing cursor while tokens arrive; the final frame is the finished bubble with its response time
+        if final:
+            text_placeholder.markdown(
+                f"<div class='chat-bubble assistant'>{text}"
+                f"<br><span style='color:#a1a1aa;font-size:0.8rem;'>⏱️ {time.time() - start_time:.2f}s</span></div>",
+                unsafe_allow_html=True
+            )
+        else:
+            text_placeholder.markdown(f"<div class='chat-bubble assistant typing-cursor'>{text}</div>",
+                                      unsafe_allow_html=True)
+
+    # Tokens are batched into a few frames per second on the one placeholder
+    renderer = StreamRenderer(render)
     try:
-        # --- Sanitize messages: remove embedded base64 images and HTML before sending ---
-        payload_messages = []
-        data_uri_re = re.compile(r"data:image/[^;]+;base64,[A-Za-z0-9+/=]+")
-        html_tag_re = re.compile(r"<[^>]+>")
-        for m in current_chat["messages"]:
-            safe_m = m.copy()
-            if isinstance(safe_m.get("content"), str):
-                # remove large base64 blobs used for inline display
-                content = data_uri_re.sub("[image omitted]", safe_m["content"])
-                # strip simple HTML tags so the model receives plain text
-                content = html_tag_re.sub("", content)
-                safe_m["content"] = content
-            payload_messages.append(safe_m)
-
-        # --- Quick connectivity check to the Ollama base URL ---
-        try:
-            health_resp = requests.get(ollama_url + "/", timeout=3)
-        except Exception as e:
-            st.error(f"❌ Can't reach Ollama at {ollama_url}: {e}")
-            raise
-
-        # Show sanitized payload in dev mode (trimmed) to help debugging
-        if 'dev_mode' in globals() and dev_mode:
-            try:
-                preview = payload_messages[-6:]
-                st.markdown("### Debug: sanitized messages sent to Ollama")
-                st.json(preview)
-            except Exception:
-                pass
-
-        response = requests.post(
-            f"{ollama_url}/api/chat",
-            json={"model": model, "messages": payload_messages, "stream": True},
-            stream=True,
-            timeout=120
-        )
-        if response.status_code != 200:
-            # provide response details to aid diagnosis
-            try:
-                body = response.text
-            except Exception:
-                body = '<unreadable response body>'
-            st.error(f"❌ Ollama returned status {response.status_code}: {body}")
-            raise RuntimeError(f"Ollama error: {response.status_code}")
-        text_placeholder = st.empty()
-        for line in response.iter_lines():
-            if line:
-                data = json.loads(line.decode("utf-8"))
-                token = data.get("message", {}).get("content", "")
-                if token:
-                    full_reply += token
-                    text_placeholder.markdown(
-                        f"<div class='chat-bubble assistant typing-cursor'>{full_reply}</div>",
-                        unsafe_allow_html=True
-                    )
-                    st.markdown(
-                        "<script>var chatDiv = window.parent.document.querySelector('.chat-container');"
-                        "if(chatDiv){chatDiv.scrollTop = chatDiv.scrollHeight;}</script>",
-                        unsafe_allow_html=True
-                    )
-                    time.sleep(0.02)
-        elapsed = time.time() - start_time
-        text_placeholder.markdown(
-            f"<div class='chat-bubble assistant'>{full_reply}"
-            f"<br><span style='color:#a1a1aa;font-size:0.8rem;'>⏱️ {elapsed:.2f}s</span></div>",
-            unsafe_allow_html=True
-        )
+        # --- Sanitize messages: plain text only (image references stay out of the payload) ---
+        payload_messages = [payload_message(m) for m in current_chat["messages"]]
+
+        # --- Keep the prompt within the model's token budget (per-chat rolling window) ---
+        window = current_chat.setdefault("context", ContextWindow())
+        window.model = model
+        window.summarize = ollama_summarizer(ollama_url, model) if summarize_old else None
+        payload_messages = window.build(payload_messages)
+
+        # --- Response cache: an identical (model, messages) request reuses the earlier reply ---
+        cache_key = request_key(model, payload_messages) if use_cache else None
+        cached_reply = response_cache.get(cache_key) if cache_key and not bypass_cache else None
+
+        if cached_reply is not None:
+            text_placeholder = st.empty()
+            renderer.add(cached_reply)
+        else:
+            # Show sanitized payload in dev mode (trimmed) to help debugging
+            if 'dev_mode' in globals() and dev_mode:
+                try:
+                    preview = payload_messages[-6:]
+                    st.markdown("### Debug: sanitized messages sent to Ollama")
+                    st.json(preview)
+                except Exception:
+                    pass
+
+            response = requests.post(
+                f"{ollama_url}/api/chat",
+                json={"model": model, "messages": payload_messages, "stream": True,
+                      "keep_alive": model_manager.use(model)},
+                stream=True,
+                timeout=120
+            )
+            if response.status_code != 200:
+                # provide response details to aid diagnosis
+                try:
+                    body = response.text
+                except Exception:
+                    body = '<unreadable response body>'
+                st.error(f"❌ Ollama returned status {response.status_code}: {body}")
+                raise RuntimeError(f"Ollama error: {response.status_code}")
+            text_placeholder = st.empty()
+            for line in response.iter_lines():
+                if line:
+                    data = json.loads(line.decode("utf-8"))
+                    renderer.add(data.get("message", {}).get("content", ""))
+            st.markdown(
+                "<script>var chatDiv = window.parent.document.querySelector('.chat-container');"
+                "if(chatDiv){chatDiv.scrollTop = chatDiv.scrollHeight;}</script>",
+                unsafe_allow_html=True
+            )
+            if cache_key and renderer.text:
+                response_cache.put(cache_key, renderer.text)
+        full_reply = renderer.close()
         current_chat["messages"].append({"role": "assistant", "content": full_reply})
     except requests.exceptions.ConnectionError:
-        st.error("❌ Couldn't connect to Ollama. Make sure Ollama is running on localhost:11434.")
+        # The sidebar status is stale now; re-probe on the next rerun
+        ollama_probe.invalidate()
+        st.error(f"❌ Couldn't connect to Ollama. Make sure Ollama is running on {ollama_url}.")
     except Exception as e:
+        ollama_probe.invalidate()
         st.error(f"❌ Error: {e}")
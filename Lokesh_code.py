@@ -2,16 +2,28 @@ import streamlit as st
 import requests
 import json
 from PIL import Image
-import pytesseract
 import base64
 import os
 import io
-
-OLLAMA_API_URL = "http://localhost:11434/api/chat"
+from collections import Counter
+from context_window import fit_messages
+from doc_index import DocIndex, document_id
+from ocr_engines import get_router
+from model_manager import get_manager
+
+OLLAMA_BASE_URL = "http://localhost:11434"
+OLLAMA_API_URL = f"{OLLAMA_BASE_URL}/api/chat"
 MODEL_NAME = "phi3:mini"
+EMBED_MODEL = "nomic-embed-text"  # `ollama pull nomic-embed-text`
+DOC_INDEX_DIR = "doc_index"
+TOP_K_CHUNKS = 4
+POPPLER_PATH = None  # folder with poppler binaries if not on PATH (used to OCR scanned PDF pages)
 
 st.set_page_config(page_title="AI Chat + OCR + Document Assistant", layout="wide")
 
+# The default chat model and the embedding model start loading as soon as the app starts
+model_manager = get_manager(OLLAMA_BASE_URL, preload=[MODEL_NAME, EMBED_MODEL], embedding_models=[EMBED_MODEL])
+
 # -------------------------------------------------
 # CSS + Animation Styles
 # -------------------------------------------------
@@ -160,6 +172,7 @@ if "chat_history" not in st.session_state:
     st.session_state.chat_history = {"Current Chat": []}
 
 messages = st.session_state.messages
+doc_index = DocIndex(DOC_INDEX_DIR, embed_model=EMBED_MODEL, base_url=OLLAMA_BASE_URL, keep_alive=model_manager.keep_alive)
 
 # -------------------------------------------------
 # Sidebar
@@ -167,6 +180,7 @@ messages = st.session_state.messages
 with st.sidebar:
     st.header("⚙️ Settings & History")
     MODEL_NAME = st.text_input("Model Name", MODEL_NAME)
+    st.caption(model_manager.label(MODEL_NAME))
 
     if st.button("🆕 New Chat"):
         if messages:
@@ -244,29 +258,72 @@ if send_button and (user_input.strip() or uploaded_file is not None):
             unsafe_allow_html=True
         )
 
-        # OCR for images
-        if file_ext in [".png", ".jpg", ".jpeg"]:
-            image = Image.open(uploaded_file)
-            with st.spinner("Extracting text from image..."):
-                ocr_text = pytesseract.image_to_string(image)
-            if ocr_text.strip():
-                doc_context = ocr_text.strip()
-
-        # Text extraction for docs
-        elif file_ext in [".pdf", ".txt", ".docx"]:
-            with st.spinner("Extracting and analyzing document..."):
-                text_content = ""
-                if file_ext == ".txt":
-                    text_content = uploaded_file.read().decode("utf-8")
-                elif file_ext == ".pdf":
-                    from PyPDF2 import PdfReader
-                    pdf = PdfReader(uploaded_file)
-                    text_content = "\n".join([page.extract_text() for page in pdf.pages if page.extract_text()])
-                elif file_ext == ".docx":
-                    from docx import Document
-                    doc = Document(uploaded_file)
-                    text_content = "\n".join([para.text for para in doc.paragraphs])
-                doc_context = text_content.strip()
+        # Each document is extracted, chunked and embedded once (keyed by its bytes);
+        # every question then retrieves only the most relevant chunks.
+        doc_id = document_id(uploaded_file.getvalue())
+        doc_text = ""
+        if not doc_index.has(doc_id):
+            # OCR for images
+            if file_ext in [".png", ".jpg", ".jpeg"]:
+                image = Image.open(uploaded_file)
+                with st.spinner("Extracting text from image..."):
+                    ocr_text = get_router().recognize(image).text
+                if ocr_text.strip():
+                    doc_text = ocr_text.strip()
+
+            # PDFs stream page by page into chunking + embedding: each page is parsed once
+            # and the first chunks are embedded while later pages are still being read
+            elif file_ext == ".pdf":
+                from doc_extract import iter_pdf_pages, describe_methods
+                page_texts, methods = [], Counter()
+                progress = st.progress(0.0, text="📑 Reading PDF...")
+
+                def pdf_pages():
+                    for page in iter_pdf_pages(uploaded_file.getvalue(), poppler_path=POPPLER_PATH):
+                        page_texts.append(page.text.strip())
+                        methods[page.method] += 1
+                        progress.progress(page.number / page.total, text=f"📑 Page {page.number}/{page.total} ({page.method})")
+                        yield page.text
+
+                try:
+                    n_chunks = doc_index.ingest(doc_id, pdf_pages(), name=uploaded_file.name)
+                    if n_chunks:
+                        st.caption(f"🧩 Indexed {n_chunks} chunk(s)")
+                except requests.exceptions.RequestException as e:
+                    st.warning(f"⚠️ Could not embed document ({e}); using its beginning instead.")
+                progress.empty()
+                st.caption(f"📑 {describe_methods(methods)}")
+                doc_text = "\n".join(t for t in page_texts if t)
+
+            # Text extraction for docs
+            elif file_ext in [".txt", ".docx"]:
+                with st.spinner("Extracting and analyzing document..."):
+                    text_content = ""
+                    if file_ext == ".txt":
+                        text_content = uploaded_file.read().decode("utf-8")
+                    elif file_ext == ".docx":
+                        from docx import Document
+                        doc = Document(uploaded_file)
+                        text_content = "\n".join([para.text for para in doc.paragraphs])
+                    doc_text = text_content.strip()
+
+            if doc_text and file_ext != ".pdf":
+                try:
+                    with st.spinner("Indexing document..."):
+                        n_chunks = doc_index.ingest(doc_id, doc_text, name=uploaded_file.name)
+                    st.caption(f"🧩 Indexed {n_chunks} chunk(s)")
+                except requests.exceptions.RequestException as e:
+                    st.warning(f"⚠️ Could not embed document ({e}); using its beginning instead.")
+
+        if doc_index.has(doc_id):
+            query = user_input.strip()
+            try:
+                chunks = [c for _, c in doc_index.search(doc_id, query, k=TOP_K_CHUNKS)] if query else None
+            except requests.exceptions.RequestException:
+                chunks = None
+            doc_context = "\n\n---\n\n".join(chunks or doc_index.head(doc_id, k=TOP_K_CHUNKS))
+        else:
+            doc_context = doc_text[:6000]
 
     # Intelligent prompt
     if doc_context:
@@ -275,13 +332,15 @@ if send_button and (user_input.strip() or uploaded_file is not None):
             "and answers user questions strictly based on its content. "
             "If the question asks for a summary or explanation, provide a clear, concise, and structured answer."
         )
-        combined_prompt = f"{system_prompt}\n\nUser query: {user_input.strip()}\n\nDocument content:\n{doc_context[:6000]}"
+        combined_prompt = f"{system_prompt}\n\nUser query: {user_input.strip()}\n\nRelevant document excerpts:\n{doc_context}"
 
     # Add messages
     messages.append({"role": "user", "content": combined_prompt})
     st.session_state.chat_history["Current Chat"].append({"role": "user", "content": combined_prompt})
 
-    payload = {"model": MODEL_NAME, "messages": messages, "stream": True}
+    # Older turns (and their document dumps) are dropped once they no longer fit the model's context
+    payload = {"model": MODEL_NAME, "messages": fit_messages(messages, model=MODEL_NAME), "stream": True,
+               "keep_alive": model_manager.use(MODEL_NAME)}
 
     with st.spinner("AI is thinking..."):
         full_reply = ""
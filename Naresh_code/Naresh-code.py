@@ -1,10 +1,22 @@
 import streamlit as st
+import json
 import time
 import requests
 import hashlib
+import os
+import sys
+
+# Shared helpers (stream_render.py, ...) live at the repository root
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _ROOT not in sys.path:
+    sys.path.insert(0, _ROOT)
+from stream_render import StreamRenderer
 
 BACKEND_CHAT = "http://127.0.0.1:8000/chat"
 BACKEND_OCR = "http://127.0.0.1:8000/ocr"
+BACKEND_JOBS = "http://127.0.0.1:8000/jobs"
+BACKEND_CONVERSATIONS = "http://127.0.0.1:8000/conversations"
+OCR_POLL_INTERVAL = 1.0  # seconds between job status checks
 
 st.set_page_config(page_title="Chat + OCR (Ollama)", layout="wide", page_icon="💬")
 
@@ -17,6 +29,24 @@ if "active_chat" not in st.session_state:
     st.session_state.active_chat = "New Chat"
 if "last_ocr_hash" not in st.session_state:
     st.session_state.last_ocr_hash = None
+if "ocr_job" not in st.session_state:
+    st.session_state.ocr_job = None
+if "conversation_ids" not in st.session_state:
+    st.session_state.conversation_ids = {}  # chat name -> server-side conversation id
+
+
+def conversation_id(chat_name: str, seed: list) -> str:
+    """
+    The backend conversation behind a chat, created on first use and seeded with the
+    messages already on screen; after that only new messages are sent.
+    """
+    ids = st.session_state.conversation_ids
+    if chat_name not in ids:
+        resp = requests.post(BACKEND_CONVERSATIONS, json={"messages": seed}, timeout=10)
+        resp.raise_for_status()
+        ids[chat_name] = resp.json()["conversation_id"]
+    return ids[chat_name]
+
 
 # -------------------- Sidebar --------------------
 with st.sidebar:
@@ -30,6 +60,7 @@ with st.sidebar:
         st.session_state.active_chat = "New Chat"
         st.session_state.messages = []
         st.session_state.chat_history["New Chat"] = []
+        st.session_state.conversation_ids.pop("New Chat", None)
 
     st.markdown("---")
     st.write("👤 User: **Naresh**")
@@ -59,39 +90,69 @@ if ocr_file:
 
     if file_hash != st.session_state.last_ocr_hash:
         st.session_state.last_ocr_hash = file_hash
-        with st.spinner("🧠 Extracting text and generating summary..."):
-            try:
-                files = {"file": (ocr_file.name, file_bytes, ocr_file.type)}
-                resp = requests.post(BACKEND_OCR, files=files, timeout=120)
-
-                if resp.status_code == 200:
-                    data = resp.json()
-                    extracted_text = data.get("extracted_text", "")
-                    ai_summary = data.get("ai_summary", "")
-
-                    if extracted_text:
-                        st.success("✅ Text extracted successfully!")
-
-                        # Add OCR result to chat
-                        st.session_state.messages.append({
-                            "role": "user",
-                            "content": f"📄 **Extracted Text:**\n\n{extracted_text}"
-                        })
-
-                        # Add AI summary automatically
-                        st.session_state.messages.append({
-                            "role": "assistant",
-                            "content": f"🤖 **AI Summary:**\n\n{ai_summary}"
-                        })
-
-                        st.session_state.chat_history[st.session_state.active_chat] = st.session_state.messages.copy()
-                        st.rerun()
-                    else:
-                        st.warning("⚠️ No text found in file.")
-                else:
-                    st.error(f"OCR Error: {resp.status_code} {resp.text}")
-            except Exception as e:
-                st.error(f"OCR request failed: {e}")
+        try:
+            # Queued as a background job; the upload returns at once with a job id
+            files = {"file": (ocr_file.name, file_bytes, ocr_file.type)}
+            resp = requests.post(BACKEND_OCR, params={"async": "true"}, files=files, timeout=30)
+            if resp.status_code == 202:
+                st.session_state.ocr_job = resp.json()["job_id"]
+            else:
+                st.error(f"OCR Error: {resp.status_code} {resp.text}")
+        except Exception as e:
+            st.error(f"OCR request failed: {e}")
+
+# Poll the job (kept in session state, so a rerun mid-job picks polling back up)
+if st.session_state.ocr_job:
+    job_id = st.session_state.ocr_job
+    progress = st.progress(0.0, text="🧠 Queued for extraction...")
+    try:
+        while True:
+            job = requests.get(f"{BACKEND_JOBS}/{job_id}", timeout=10).json()
+            if "status" not in job or job["status"] in ("done", "failed"):
+                break  # finished, or unknown job id (the result call reports the error)
+            if job["pages_total"]:
+                progress.progress(job["pages_done"] / job["pages_total"],
+                                  text=f"🧠 Extracting page {job['pages_done']}/{job['pages_total']}...")
+            elif job["status"] == "running":
+                progress.progress(0.0, text="🧠 Extracting text and generating summary...")
+            time.sleep(OCR_POLL_INTERVAL)
+
+        data = requests.get(f"{BACKEND_JOBS}/{job_id}/result", timeout=10).json()
+        st.session_state.ocr_job = None
+        progress.empty()
+        extracted_text = data.get("extracted_text", "")
+        ai_summary = data.get("ai_summary", "")
+
+        if extracted_text:
+            st.success("✅ Text extracted successfully!")
+
+            # Add OCR result to chat
+            st.session_state.messages.append({
+                "role": "user",
+                "content": f"📄 **Extracted Text:**\n\n{extracted_text}"
+            })
+
+            # Add AI summary automatically
+            st.session_state.messages.append({
+                "role": "assistant",
+                "content": f"🤖 **AI Summary:**\n\n{ai_summary or data.get('error', '')}"
+            })
+
+            # A chat that already has a backend conversation gets the OCR result too
+            chat_id = st.session_state.conversation_ids.get(st.session_state.active_chat)
+            if chat_id:
+                requests.post(f"{BACKEND_CONVERSATIONS}/{chat_id}/messages",
+                              json={"messages": st.session_state.messages[-2:]}, timeout=10)
+
+            st.session_state.chat_history[st.session_state.active_chat] = st.session_state.messages.copy()
+            st.rerun()
+        elif data.get("error"):
+            st.error(f"OCR Error: {data['error']}")
+        else:
+            st.warning("⚠️ No text found in file.")
+    except requests.exceptions.RequestException as e:
+        progress.empty()
+        st.error(f"OCR status check failed: {e}")
 
 # -------------------- Chat Input --------------------
 prompt = st.chat_input("Type your message...")
@@ -105,33 +166,51 @@ if prompt:
             short_title = f"{base}_{suffix}"
             suffix += 1
         st.session_state.chat_history[short_title] = st.session_state.chat_history.pop("New Chat")
+        if "New Chat" in st.session_state.conversation_ids:
+            st.session_state.conversation_ids[short_title] = st.session_state.conversation_ids.pop("New Chat")
         st.session_state.active_chat = short_title
 
     st.session_state.messages.append({"role": "user", "content": prompt})
     with st.chat_message("user"):
         st.markdown(prompt)
 
-    try:
-        resp = requests.post(
-            BACKEND_CHAT,
-            json={"message": prompt, "history": st.session_state.messages},
-            timeout=120,
-        )
-        if resp.status_code == 200:
-            reply = resp.json().get("reply", "⚠️ No reply.")
-        else:
-            reply = f"⚠️ Chat Error: {resp.status_code} {resp.text}"
-    except Exception as e:
-        reply = f"⚠️ Request Failed: {e}"
-
+    # Stream NDJSON frames from the backend and render tokens as they arrive
     with st.chat_message("assistant"):
         placeholder = st.empty()
-        full_text = ""
-        for chunk in reply.split():
-            full_text += chunk + " "
-            time.sleep(0.03)
-            placeholder.markdown(full_text + "▌")
-        placeholder.markdown(full_text)
+        # The cursor stays until the final frame
+        renderer = StreamRenderer(lambda text, final: placeholder.markdown(text if final else text + "▌"))
+        try:
+            # History lives on the backend: only the new message and the conversation id are sent
+            chat_id = conversation_id(st.session_state.active_chat, st.session_state.messages[:-1])
+            with requests.post(
+                BACKEND_CHAT,
+                json={"message": prompt, "conversation_id": chat_id, "stream": True},
+                stream=True,
+                timeout=120,
+            ) as resp:
+                if resp.status_code == 200:
+                    for line in resp.iter_lines():
+                        if not line:
+                            continue
+                        frame = json.loads(line)
+                        if frame.get("token"):
+                            renderer.add(frame["token"])
+                        elif frame.get("error"):
+                            renderer.add(("\n\n" if renderer.text else "") + frame["error"])
+                        elif frame.get("done"):
+                            break
+                elif resp.status_code == 404:
+                    # The backend no longer has this conversation (expired); the next message starts a new one
+                    st.session_state.conversation_ids.pop(st.session_state.active_chat, None)
+                    renderer.add("⚠️ Conversation expired on the server, please send your message again.")
+                else:
+                    renderer.add(f"⚠️ Chat Error: {resp.status_code} {resp.text}")
+        except Exception as e:
+            renderer.add(("\n\n" if renderer.text else "") + f"⚠️ Request Failed: {e}")
+
+        if not renderer.text:
+            renderer.add("⚠️ No reply.")
+        reply = renderer.close()
 
     st.session_state.messages.append({"role": "assistant", "content": reply})
     st.session_state.chat_history[st.session_state.active_chat] = st.session_state.messages.copy()
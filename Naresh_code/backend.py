@@ -1,23 +1,165 @@
 import os
-import io
-import numpy as np
-import requests
-from fastapi import FastAPI, UploadFile, File
+import sys
+import json
+import queue
+import asyncio
+import zipfile
+from contextlib import aclosing, asynccontextmanager
+import httpx
+from fastapi import FastAPI, UploadFile, File, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
-from PIL import Image
-import pytesseract
-import easyocr
-import pdfplumber
-from docx import Document
 
+# Shared helpers (context_window.py, doc_extract.py, ...) live at the repository root
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _ROOT not in sys.path:
+    sys.path.insert(0, _ROOT)
+from context_window import (
+    MESSAGE_OVERHEAD_TOKENS, SUMMARY_TOKENS, context_budget, estimate_tokens, fit_messages, message_tokens,
+    summary_message, summary_update_prompt, truncate_to_tokens,
+)
+from model_manager import keep_alive_value
+from response_cache import ResponseCache, request_key
+from summarizer import PROMPT_OVERHEAD_TOKENS, MapReduceSummarizer, SummaryEvent
+
+from conversations import ConversationStore
+from extract_cache import ExtractionCache, file_hash
+from extraction import (
+    EXTRACTOR_VERSION, EXTRACTORS, Extracted, UnsupportedFileType,
+    file_kind, init_worker, is_archive, ocr_status, preload_ocr,
+)
+from jobs import JobJournal, JobQueue
+from uploads import UploadTooLarge, spool_upload, unzip_to_disk
+from worker_pool import PoolFull, WorkerPool
+
+
+# -------------------- Config --------------------
+OLLAMA_URL = os.getenv("OLLAMA_URL", "http://localhost:11434/api/generate")
+MODEL_NAME = os.getenv("MODEL_NAME", "llama3")
+
+# /chat engine: "generate" sends the flattened transcript to /api/generate; "chat" sends structured
+# messages to /api/chat, so Ollama reuses its KV cache for the unchanged start of the conversation;
+# "context" sends only the new turn plus the `context` Ollama returned for the previous turn of a
+# stored conversation, so earlier turns aren't evaluated again at all
+CHAT_ENGINE = os.getenv("CHAT_ENGINE", "generate")
+OLLAMA_CHAT_URL = os.getenv("OLLAMA_CHAT_URL") or OLLAMA_URL.rsplit("/api/", 1)[0] + "/api/chat"
+# How long Ollama keeps the model loaded after a request ("30m", "-1" = until restart; empty = Ollama's default)
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "")
+
+# Shared Ollama connection pool (one per process, opened on startup)
+OLLAMA_MAX_CONNECTIONS = int(os.getenv("OLLAMA_MAX_CONNECTIONS", "20"))
+OLLAMA_MAX_KEEPALIVE = int(os.getenv("OLLAMA_MAX_KEEPALIVE", "10"))
+OLLAMA_CONNECT_TIMEOUT = float(os.getenv("OLLAMA_CONNECT_TIMEOUT", "5"))
+OLLAMA_CHAT_TIMEOUT = float(os.getenv("OLLAMA_CHAT_TIMEOUT", "120"))
+OLLAMA_SUMMARY_TIMEOUT = float(os.getenv("OLLAMA_SUMMARY_TIMEOUT", "120"))
+
+# Prompt token budget for /chat history; 0 = derive from MODEL_NAME's context size
+CONTEXT_TOKENS = int(os.getenv("CONTEXT_TOKENS", "0")) or context_budget(MODEL_NAME)
+
+# Server-side /chat conversations; with CONVERSATION_SUMMARY=1, turns that no longer fit
+# CONTEXT_TOKENS are folded into a rolling summary every CONVERSATION_SUMMARIZE_EVERY messages
+CONVERSATIONS_PATH = os.getenv("CONVERSATIONS_PATH", "conversations.sqlite3")
+CONVERSATION_TTL_DAYS = float(os.getenv("CONVERSATION_TTL_DAYS", "30"))
+CONVERSATION_SUMMARY = os.getenv("CONVERSATION_SUMMARY", "0") == "1"
+CONVERSATION_SUMMARIZE_EVERY = int(os.getenv("CONVERSATION_SUMMARIZE_EVERY", "6"))
+
+# Documents longer than one prompt are summarized map-reduce style: chunks of at most
+# SUMMARY_CHUNK_TOKENS (0 = fit CONTEXT_TOKENS), SUMMARY_PARALLEL Ollama requests at a time
+SUMMARY_CHUNK_TOKENS = int(os.getenv("SUMMARY_CHUNK_TOKENS", "0")) or CONTEXT_TOKENS - PROMPT_OVERHEAD_TOKENS
+SUMMARY_PARALLEL = int(os.getenv("SUMMARY_PARALLEL", "2"))
+
+# Opt-in cache of Ollama replies for byte-identical (model, prompt) requests
+RESPONSE_CACHE = os.getenv("RESPONSE_CACHE", "0") == "1"
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "3600"))
+RESPONSE_CACHE_ENTRIES = int(os.getenv("RESPONSE_CACHE_ENTRIES", "1024"))
+RESPONSE_CACHE_MB = int(os.getenv("RESPONSE_CACHE_MB", "64"))
 
-# --- Optional: point pytesseract to the installed Tesseract executable (Windows only)
-pytesseract.pytesseract.tesseract_cmd = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
+# OCR / file extraction pool ("thread" or "process"); 0 workers = one per CPU core
+EXTRACT_POOL = os.getenv("EXTRACT_POOL", "thread")
+EXTRACT_WORKERS = int(os.getenv("EXTRACT_WORKERS", "0"))
+EXTRACT_QUEUE_SIZE = int(os.getenv("EXTRACT_QUEUE_SIZE", "16"))
+EXTRACT_RETRY_AFTER = int(os.getenv("EXTRACT_RETRY_AFTER", "5"))
+
+# Warm the OCR model in the background at startup instead of on the first /ocr request
+OCR_PRELOAD = os.getenv("OCR_PRELOAD", "0") == "1"
+
+# Uploads are spooled to disk in chunks (UPLOAD_SPOOL_DIR, default: the system temp dir)
+# instead of being held in memory; larger /ocr uploads are refused with a 413
+OCR_MAX_UPLOAD_MB = int(os.getenv("OCR_MAX_UPLOAD_MB", "100"))
+UPLOAD_SPOOL_DIR = os.getenv("UPLOAD_SPOOL_DIR") or None
+
+# /ocr/batch limits (zip archives count by their expanded size) and summary batching
+OCR_BATCH_MAX_FILES = int(os.getenv("OCR_BATCH_MAX_FILES", "100"))
+OCR_BATCH_MAX_MB = int(os.getenv("OCR_BATCH_MAX_MB", "200"))
+OCR_BATCH_SUMMARY_DOCS = int(os.getenv("OCR_BATCH_SUMMARY_DOCS", "8"))
+
+# Background /ocr jobs (?async=true): journal + uploads survive restarts, finished jobs kept JOB_TTL_HOURS
+JOBS_PATH = os.getenv("JOBS_PATH", "jobs.sqlite3")
+JOBS_INPUT_DIR = os.getenv("JOBS_INPUT_DIR", "job_inputs")
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_TTL_HOURS = float(os.getenv("JOB_TTL_HOURS", "24"))
+
+# /ocr result cache keyed by file content hash (set EXTRACT_CACHE=0 to disable)
+EXTRACT_CACHE = os.getenv("EXTRACT_CACHE", "1") == "1"
+EXTRACT_CACHE_PATH = os.getenv("EXTRACT_CACHE_PATH", "extract_cache.sqlite3")
+EXTRACT_CACHE_MEMORY_MB = int(os.getenv("EXTRACT_CACHE_MEMORY_MB", "64"))
+EXTRACT_CACHE_DISK_MB = int(os.getenv("EXTRACT_CACHE_DISK_MB", "1024"))
 
 
 # -------------------- FastAPI Setup --------------------
-app = FastAPI(title="Chat + OCR + File Reader Backend")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Opens one keep-alive HTTP client to Ollama, the extraction worker pool, the caches, the
+    conversation store and the background job queue, and closes them on shutdown.
+    """
+    app.state.extract_pool = WorkerPool(
+        kind=EXTRACT_POOL,
+        workers=EXTRACT_WORKERS,
+        max_queue=EXTRACT_QUEUE_SIZE,
+        # Each process worker has its own models to load; thread workers share this process's,
+        # which load on the first image unless OCR_PRELOAD is set
+        initializer=init_worker if EXTRACT_POOL == "process" else None,
+    )
+    if OCR_PRELOAD and EXTRACT_POOL == "thread":
+        preload_ocr()
+    app.state.extract_cache = ExtractionCache(
+        EXTRACT_CACHE_PATH,
+        memory_max_bytes=EXTRACT_CACHE_MEMORY_MB * 1024 * 1024,
+        disk_max_bytes=EXTRACT_CACHE_DISK_MB * 1024 * 1024,
+    ) if EXTRACT_CACHE else None
+    app.state.response_cache = ResponseCache(
+        max_entries=RESPONSE_CACHE_ENTRIES,
+        max_bytes=RESPONSE_CACHE_MB * 1024 * 1024,
+        ttl=RESPONSE_CACHE_TTL,
+    ) if RESPONSE_CACHE else None
+    app.state.ollama = httpx.AsyncClient(
+        timeout=httpx.Timeout(OLLAMA_CHAT_TIMEOUT, connect=OLLAMA_CONNECT_TIMEOUT),
+        limits=httpx.Limits(
+            max_connections=OLLAMA_MAX_CONNECTIONS,
+            max_keepalive_connections=OLLAMA_MAX_KEEPALIVE,
+        ),
+    )
+    app.state.conversations = ConversationStore(CONVERSATIONS_PATH)
+    await asyncio.to_thread(app.state.conversations.prune, CONVERSATION_TTL_DAYS * 24 * 3600)
+    app.state.jobs = JobQueue(
+        JobJournal(JOBS_PATH, JOBS_INPUT_DIR), run_ocr_job, workers=JOB_WORKERS, max_age=JOB_TTL_HOURS * 3600,
+    )
+    await app.state.jobs.start()
+    try:
+        yield
+    finally:
+        await app.state.jobs.stop()
+        app.state.jobs.journal.close()
+        app.state.conversations.close()
+        await app.state.ollama.aclose()
+        app.state.extract_pool.shutdown()
+        if app.state.extract_cache:
+            app.state.extract_cache.close()
+
+
+app = FastAPI(title="Chat + OCR + File Reader Backend", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -27,106 +169,895 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# -------------------- Config --------------------
-OLLAMA_URL = os.getenv("OLLAMA_URL", "http://localhost:11434/api/generate")
-MODEL_NAME = os.getenv("MODEL_NAME", "llama3")
 
-# OCR setup
-reader = easyocr.Reader(['en'], gpu=False)
+# -------------------- Ollama Client --------------------
+def keep_alive(payload: dict) -> dict:
+    if OLLAMA_KEEP_ALIVE:
+        payload["keep_alive"] = keep_alive_value(OLLAMA_KEEP_ALIVE)
+    return payload
+
+
+async def ollama_generate(prompt: str, timeout: float = OLLAMA_CHAT_TIMEOUT, fmt: str = None) -> httpx.Response:
+    """
+    Sends a single non-streaming /api/generate request through the shared client
+    (fmt="json" constrains the reply to valid JSON).
+    """
+    payload = keep_alive({"model": MODEL_NAME, "prompt": prompt, "stream": False})
+    if fmt:
+        payload["format"] = fmt
+    return await app.state.ollama.post(
+        OLLAMA_URL, json=payload, timeout=httpx.Timeout(timeout, connect=OLLAMA_CONNECT_TIMEOUT)
+    )
+
+
+def chat_request(turns: list, context: list = None):
+    """
+    (url, payload) for one /chat turn with the configured CHAT_ENGINE. With a `context` from
+    the previous turn, only the new message is sent.
+    """
+    if CHAT_ENGINE == "chat":
+        return OLLAMA_CHAT_URL, keep_alive({"model": MODEL_NAME, "messages": turns})
+    if context:
+        prompt = f"\nUser: {turns[-1]['content']}\nAssistant:"
+        return OLLAMA_URL, keep_alive({"model": MODEL_NAME, "prompt": prompt, "context": context})
+    return OLLAMA_URL, keep_alive({"model": MODEL_NAME, "prompt": flatten_turns(turns)})
+
+
+def reply_text(data: dict) -> str:
+    if "message" in data:  # /api/chat
+        return data["message"].get("content", "")
+    return data.get("response") or data.get("text") or ""
+
+
+def chat_key(payload: dict) -> str:
+    # A reply to a context request depends on the context too
+    context = payload.get("context")
+    return request_key(MODEL_NAME, messages=payload.get("messages"), prompt=payload.get("prompt"),
+                       options={"context": context} if context else None)
+
+
+def cached_reply(prompt: str, fresh: bool = False, key: str = None):
+    cache = app.state.response_cache
+    if cache is None or fresh:
+        return None
+    return cache.get(key or request_key(MODEL_NAME, prompt=prompt))
+
+
+def remember_reply(prompt: str, reply: str, key: str = None):
+    cache = app.state.response_cache
+    if cache is not None and reply:
+        cache.put(key or request_key(MODEL_NAME, prompt=prompt), reply)
+
+
+def ndjson_frame(**fields) -> bytes:
+    return (json.dumps(fields, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+async def ollama_stream(url: str, payload: dict, timeout: float = OLLAMA_CHAT_TIMEOUT, on_reply=None):
+    """
+    Streams /api/generate or /api/chat tokens as NDJSON frames:
+    {"token": "..."} per token, {"error": "..."} on failure, and always a final {"done": true}.
+    `on_reply(reply, final)` is awaited with the full reply and Ollama's last frame once it completes.
+    """
+    payload = dict(payload, stream=True)
+    tokens = []
+    try:
+        async with app.state.ollama.stream(
+            "POST", url, json=payload, timeout=httpx.Timeout(timeout, connect=OLLAMA_CONNECT_TIMEOUT)
+        ) as r:
+            if r.status_code != 200:
+                body = (await r.aread()).decode("utf-8", errors="replace")
+                yield ndjson_frame(error=f"⚠️ Ollama returned {r.status_code}: {body}")
+            else:
+                async for line in r.aiter_lines():
+                    if not line:
+                        continue
+                    data = json.loads(line)
+                    if data.get("error"):
+                        yield ndjson_frame(error=f"⚠️ Ollama Error: {data['error']}")
+                        break
+                    token = reply_text(data)
+                    if token:
+                        tokens.append(token)
+                        yield ndjson_frame(token=token)
+                    if data.get("done"):
+                        remember_reply(None, "".join(tokens), key=chat_key(payload))
+                        if on_reply:
+                            await on_reply("".join(tokens), data)
+                        break
+    except Exception as e:
+        yield ndjson_frame(error=f"⚠️ Ollama Error: {e}")
+    yield ndjson_frame(done=True)
+
+
+async def replay_stream(reply: str):
+    yield ndjson_frame(token=reply)
+    yield ndjson_frame(done=True)
 
 
 # -------------------- Chat Endpoint --------------------
 class ChatRequest(BaseModel):
     message: str
     history: list = []
+    conversation_id: str = None  # stored conversation: history is kept server-side instead
+    stream: bool = False
+    fresh: bool = False  # skip the response cache
+
+
+def flatten_turns(turns: list) -> str:
+    history, message = turns[:-1], turns[-1]["content"]
+
+    conversation = ""
+    for item in history:
+        role = item.get("role", "user")
+        content = item.get("content", "")
+        if role == "system":
+            conversation += f"{content}\n"
+        else:
+            conversation += f"{'User' if role == 'user' else 'Assistant'}: {content}\n"
+
+    conversation += f"User: {message}\nAssistant:"
+    return conversation
+
+
+async def conversation_turns(conversation: dict, message: str) -> list:
+    """
+    Prompt turns for a new message in a stored conversation: its rolling summary (if any), the
+    newest stored messages that fit CONTEXT_TOKENS, then the message.
+    With CONVERSATION_SUMMARY=1, messages that fell out of the window are folded into the
+    summary (at most once every CONVERSATION_SUMMARIZE_EVERY messages).
+    """
+    store = app.state.conversations
+    conversation_id = conversation["id"]
+    new = {"role": "user", "content": message}
+    reserved = SUMMARY_TOKENS + MESSAGE_OVERHEAD_TOKENS if CONVERSATION_SUMMARY else 0
+    first, kept = await asyncio.to_thread(store.tail, conversation_id, CONTEXT_TOKENS - reserved - message_tokens(new))
+
+    summary, summarized = conversation["summary"], conversation["summarized"]
+    if CONVERSATION_SUMMARY and first > summarized and first - summarized >= min(CONVERSATION_SUMMARIZE_EVERY, first):
+        dropped = await asyncio.to_thread(store.messages, conversation_id, summarized, first)
+        try:
+            r = await ollama_generate(summary_update_prompt(dropped, summary), timeout=OLLAMA_SUMMARY_TIMEOUT)
+            r.raise_for_status()
+            summary = truncate_to_tokens((r.json().get("response") or "").strip(), SUMMARY_TOKENS)
+            await asyncio.to_thread(store.set_summary, conversation_id, summary, first)
+        except Exception:
+            pass  # keep the previous summary; the turns are simply dropped
+
+    if first and summary:
+        kept = [summary_message(summary)] + kept
+    return kept + [new]
 
 
 @app.post("/chat")
 async def chat_with_ollama(req: ChatRequest):
     """
     Sends a message and conversation history to Ollama model and returns AI reply.
+    With a "conversation_id" (from POST /conversations) the history is read from the server
+    and the new turn is stored there, so only the new message needs to be sent.
+    With "stream": true the reply is sent as NDJSON token frames as Ollama produces them.
     """
-    try:
-        conversation = ""
-        for item in req.history:
-            role = item.get("role", "user")
-            content = item.get("content", "")
-            conversation += f"{'User' if role == 'user' else 'Assistant'}: {content}\n"
+    store = app.state.conversations
+    context = None
+    if req.conversation_id:
+        conversation = await asyncio.to_thread(store.get, req.conversation_id)
+        if conversation is None:
+            return JSONResponse(status_code=404, content={"error": "Unknown conversation_id"})
+        new = {"role": "user", "content": req.message}
+        # The previous turn's context still describes this conversation if nothing was added since
+        # and there's room left in it; otherwise the prompt is rebuilt from the stored messages
+        if (CHAT_ENGINE == "context" and conversation["context"]
+                and conversation["context_at"] == conversation["messages"]
+                and len(conversation["context"]) + message_tokens(new) <= CONTEXT_TOKENS):
+            context, turns = conversation["context"], [new]
+        else:
+            turns = await conversation_turns(conversation, req.message)
+    else:
+        # Only the most recent turns that fit the token budget are sent, so prompt size stays bounded
+        turns = fit_messages(list(req.history) + [{"role": "user", "content": req.message}], budget=CONTEXT_TOKENS)
+    url, payload = chat_request(turns, context)
+    key = chat_key(payload)
+
+    async def save_turn(reply: str, final: dict = None):
+        if req.conversation_id and reply:
+            count = await asyncio.to_thread(
+                store.append, req.conversation_id,
+                [{"role": "user", "content": req.message}, {"role": "assistant", "content": reply}], message_tokens,
+            )
+            if CHAT_ENGINE == "context" and final and final.get("context") and count:
+                await asyncio.to_thread(store.set_context, req.conversation_id, final["context"], count)
+
+    reply = cached_reply(None, fresh=req.fresh, key=key)
+
+    if req.stream:
+        if reply is not None:
+            await save_turn(reply)
+        return StreamingResponse(
+            replay_stream(reply) if reply is not None else ollama_stream(url, payload, on_reply=save_turn),
+            media_type="application/x-ndjson",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
 
-        conversation += f"User: {req.message}\nAssistant:"
+    if reply is not None:
+        await save_turn(reply)
+        return {"reply": reply, "cached": True}
 
-        payload = {"model": MODEL_NAME, "prompt": conversation, "stream": False}
-        r = requests.post(OLLAMA_URL, json=payload, timeout=120)
+    try:
+        r = await app.state.ollama.post(
+            url, json=dict(payload, stream=False),
+            timeout=httpx.Timeout(OLLAMA_CHAT_TIMEOUT, connect=OLLAMA_CONNECT_TIMEOUT),
+        )
         r.raise_for_status()
         data = r.json()
 
-        reply = data.get("response") or data.get("text") or "⚠️ No reply from Ollama"
-        return {"reply": reply}
+        reply = reply_text(data)
+        remember_reply(None, reply, key=key)
+        await save_turn(reply, data)
+        return {"reply": reply or "⚠️ No reply from Ollama"}
 
     except Exception as e:
         return {"reply": f"⚠️ Ollama Error: {e}"}
 
 
-# -------------------- OCR / File Extraction Endpoint --------------------
+# -------------------- Conversations --------------------
+class ConversationMessages(BaseModel):
+    messages: list = []  # [{"role", "content"}]
+
+
+@app.post("/conversations")
+async def create_conversation(req: ConversationMessages = None):
+    """
+    Starts a server-side conversation, optionally seeded with existing messages.
+    """
+    store = app.state.conversations
+    conversation_id = await asyncio.to_thread(store.create)
+    if req and req.messages:
+        await asyncio.to_thread(store.append, conversation_id, req.messages, message_tokens)
+    return {"conversation_id": conversation_id}
+
+
+@app.post("/conversations/{conversation_id}/messages")
+async def add_conversation_messages(conversation_id: str, req: ConversationMessages):
+    """
+    Appends messages without asking the model (e.g. an OCR result shown in the chat).
+    """
+    count = await asyncio.to_thread(app.state.conversations.append, conversation_id, req.messages, message_tokens)
+    if count is None:
+        return JSONResponse(status_code=404, content={"error": "Unknown conversation_id"})
+    return {"conversation_id": conversation_id, "messages": count}
+
+
+@app.get("/conversations/{conversation_id}")
+async def get_conversation(conversation_id: str, since: int = 0):
+    """
+    The stored messages from index `since` on (a client that has the first N asks for since=N).
+    """
+    store = app.state.conversations
+    conversation = await asyncio.to_thread(store.get, conversation_id)
+    if conversation is None:
+        return JSONResponse(status_code=404, content={"error": "Unknown conversation_id"})
+    return {
+        "conversation_id": conversation_id,
+        "total": conversation["messages"],
+        "summary": conversation["summary"],
+        "messages": await asyncio.to_thread(store.messages, conversation_id, since),
+    }
+
+
+@app.delete("/conversations/{conversation_id}")
+async def delete_conversation(conversation_id: str):
+    if not await asyncio.to_thread(app.state.conversations.delete, conversation_id):
+        return JSONResponse(status_code=404, content={"error": "Unknown conversation_id"})
+    return {"deleted": conversation_id}
+
+
+# -------------------- OCR / File Extraction --------------------
+class SummaryFailed(RuntimeError):
+    pass
+
+
+def summary_prompt(text: str) -> str:
+    return f"The following text was extracted from a document:\n\n{text}\n\nPlease summarize it clearly and concisely."
+
+
+def document_keys(kind: str, digest: str):
+    text_key = f"text:{kind}:{EXTRACTOR_VERSION}:{digest}"
+    summary_key = f"summary:{MODEL_NAME}:{kind}:{EXTRACTOR_VERSION}:{digest}"
+    return text_key, summary_key
+
+
+def extracted_fields(extracted: Extracted) -> dict:
+    """
+    {"extracted_text"} of a response body (and cache entry), plus {"pages": {method: count}} for PDFs.
+    """
+    fields = {"extracted_text": extracted.text}
+    if extracted.pages:
+        fields["pages"] = extracted.pages
+    return fields
+
+
+async def cached_document(kind: str, path: str, digest: str = None):
+    """
+    (text_key, summary_key, cached Extracted, cached_summary) for the file at `path`; all None when
+    caching is off, the last two None on a miss. Same bytes + same extractor (+ same model) => same result.
+    """
+    cache = app.state.extract_cache
+    if not cache:
+        return None, None, None, None
+    digest = digest or await asyncio.to_thread(file_hash, path)
+    text_key, summary_key = document_keys(kind, digest)
+    # SQLite lookups (and the access-time update) run on a thread, like the other stores' calls
+    cached_text = await asyncio.to_thread(cache.get, text_key)
+    if not cached_text:
+        return text_key, summary_key, None, None
+    cached_summary = await asyncio.to_thread(cache.get, summary_key)
+    extracted = Extracted(cached_text["extracted_text"], cached_text.get("pages"))
+    return text_key, summary_key, extracted, cached_summary and cached_summary["ai_summary"]
+
+
+async def remember_text(text_key: str, extracted: Extracted):
+    cache = app.state.extract_cache
+    if cache and text_key:
+        await asyncio.to_thread(cache.put, text_key, extracted_fields(extracted))
+
+
+async def extract_document(kind: str, path: str, digest: str = None, progress=None):
+    """
+    Extracted text of the file at `path`, from the extraction cache or the worker pool (raises PoolFull
+    when the pool is saturated). Returns (extracted, summary_key, cached_summary); the keys are None when
+    caching is off. `progress(pages_done, pages_total)` is reported for PDFs on a thread pool
+    (a callback can't cross into a worker process).
+    """
+    text_key, summary_key, extracted, cached_summary = await cached_document(kind, path, digest)
+    if extracted is not None:
+        return extracted, summary_key, cached_summary
+    extracted = await run_extractor(kind, path, progress)
+    await remember_text(text_key, extracted)
+    return extracted, summary_key, None
+
+
+async def run_extractor(kind: str, path: str, progress=None) -> Extracted:
+    # --- OCR / parsing runs in the worker pool so the event loop stays free ---
+    pool = app.state.extract_pool
+    args = (path, progress) if progress and kind == "pdf" and pool.kind == "thread" else (path,)
+    return await pool.submit(EXTRACTORS[kind], *args, label=kind)
+
+
+def start_pdf_extraction(path: str, progress=None):
+    """
+    Starts extracting a PDF on the (thread) worker pool. Returns (extraction, pages): a future
+    for its Extracted, and an iterator over each page's text as soon as it's read, ending when
+    the extraction does. Raises PoolFull right away when the pool is saturated.
+    """
+    feed = queue.Queue()
+    extraction = app.state.extract_pool.start(
+        EXTRACTORS["pdf"], path, progress, lambda page: feed.put(page.text), label="pdf",
+    )
+    extraction.add_done_callback(lambda _: feed.put(None))
+
+    def pages():
+        while (text := feed.get()) is not None:
+            yield text
+
+    return extraction, pages()
+
+
+async def remember_summary(summary_key: str, summary: str):
+    cache = app.state.extract_cache
+    if summary and cache and summary_key:
+        await asyncio.to_thread(cache.put, summary_key, {"ai_summary": summary})
+
+
+async def ollama_summary(prompt: str) -> str:
+    try:
+        ai_response = await ollama_generate(prompt, timeout=OLLAMA_SUMMARY_TIMEOUT)
+    except httpx.HTTPError as e:
+        # Ollama down or too slow: the same failure as an error reply, so callers keep the extracted text
+        raise SummaryFailed(f"Ollama summary failed: {e}") from e
+    if ai_response.status_code != 200:
+        raise SummaryFailed(f"Ollama summary failed: {ai_response.text}")
+    data = ai_response.json()
+    return data.get("response") or data.get("text")
+
+
+async def summary_events(text, summary_key: str = None, fresh: bool = False):
+    """
+    SummaryEvents for one document's text (a string, or an iterable of pages still being read):
+    a "chunk" event per partial summary of a long document as it completes, then "final"
+    (raises SummaryFailed on an Ollama error). Chunk summaries go through the response cache, when it's on.
+    """
+    summarizer = MapReduceSummarizer(
+        ollama_summary, model=MODEL_NAME, chunk_tokens=SUMMARY_CHUNK_TOKENS, parallel=SUMMARY_PARALLEL,
+        cache=app.state.response_cache, prompt=summary_prompt,
+    )
+    async for event in summarizer.stream(text, fresh=fresh):
+        if event.kind == "final":
+            await remember_summary(summary_key, event.text)
+        yield event
+
+
+async def summarize_text(text: str, summary_key: str = None, fresh: bool = False) -> str:
+    """
+    Ollama summary of one document's text (raises SummaryFailed on an Ollama error).
+    """
+    async for event in summary_events(text, summary_key, fresh=fresh):
+        if event.kind == "final":
+            return event.text
+
+
+# The /ocr pipeline below works on SummaryEvents plus one of kind "text", carrying the
+# Extracted document; it always comes before "final"
+async def document_events(extracted: Extracted, summary_key: str = None, fresh: bool = False):
+    yield SummaryEvent("text", 0, 1, extracted)
+    async for event in summary_events(extracted.text, summary_key, fresh=fresh):
+        yield event
+
+
+async def pdf_document_events(extraction, pages, text_key: str = None, summary_key: str = None,
+                              fresh: bool = False):
+    """
+    document_events() for a PDF that is still being extracted (see start_pdf_extraction): its
+    first chunks are summarized while later pages are still read or OCR'd. The "text" event
+    follows as soon as extraction has finished; an extraction error is raised in its place.
+    When summarizing fails, the extraction is still awaited (and cached) before the error is raised.
+    """
+    result = None
+
+    async def extracted():
+        nonlocal result
+        result = await extraction
+        await remember_text(text_key, result)
+        return SummaryEvent("text", 0, 1, result)
+
+    try:
+        async for event in summary_events(pages, summary_key, fresh=fresh):
+            if result is None and (extraction.done() or event.kind == "final"):
+                yield await extracted()
+            yield event
+    except Exception:
+        if result is None:
+            yield await extracted()
+        raise
+
+
+async def document_result(events) -> dict:
+    """
+    The /ocr response body from document events.
+    """
+    fields = {}
+    async with aclosing(events):
+        try:
+            async for event in events:
+                if event.kind == "text":
+                    if not event.text.text:
+                        return {"error": "No readable text found in file."}
+                    fields = extracted_fields(event.text)
+                elif event.kind == "final":
+                    return {**fields, "ai_summary": event.text or "⚠️ No AI summary"}
+        except SummaryFailed as e:
+            return {**fields, "error": str(e)}
+
+
+async def summary_frames(events):
+    """
+    NDJSON body of /ocr?stream=true: {"extracted_text", "pages"} once the text is known, a
+    {"part", "parts", "summary"} frame per partial summary, then {"ai_summary", "done": true}
+    (or {"error", "done": true}). "parts" is null until the whole text has been split; for PDFs,
+    parts can arrive before the text, since summarizing starts while later pages are read.
+    """
+    async with aclosing(events):
+        try:
+            async for event in events:
+                if event.kind == "text":
+                    if not event.text.text:
+                        yield ndjson_frame(error="No readable text found in file.", done=True)
+                        return
+                    yield ndjson_frame(**extracted_fields(event.text))
+                elif event.kind == "chunk":
+                    yield ndjson_frame(part=event.index + 1, parts=event.total, summary=event.text)
+                else:
+                    yield ndjson_frame(ai_summary=event.text or "⚠️ No AI summary", done=True)
+        except SummaryFailed as e:
+            yield ndjson_frame(error=str(e), done=True)
+        except Exception as e:
+            yield ndjson_frame(error=f"Processing error: {e}", done=True)
+
+
+def ndjson_response(body) -> StreamingResponse:
+    return StreamingResponse(
+        body, media_type="application/x-ndjson", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def ocr_document(filename: str, path: str, fresh: bool = False, progress=None, digest: str = None,
+                       stream: bool = False):
+    """
+    Extracts and summarizes one spooled file; the /ocr response body. Raises PoolFull.
+    With `stream`, the body is a StreamingResponse of summary_frames() instead.
+    PDFs on a thread pool are summarized while they're extracted (see pdf_document_events).
+    """
+    try:
+        kind = file_kind(filename)
+    except UnsupportedFileType:
+        return {"error": "Unsupported file type. Please upload image, PDF, or DOCX."}
+
+    text_key, summary_key, extracted, cached_summary = await cached_document(kind, path, digest)
+    if extracted is None and kind == "pdf" and app.state.extract_pool.kind == "thread":
+        extraction, pages = start_pdf_extraction(path, progress)
+        events = pdf_document_events(extraction, pages, text_key, summary_key, fresh=fresh)
+    else:
+        if extracted is None:
+            extracted = await run_extractor(kind, path, progress)
+            await remember_text(text_key, extracted)
+        if not extracted.text:
+            return {"error": "No readable text found in file."}
+        if cached_summary and not fresh:
+            if stream:
+                return ndjson_response(iter([
+                    ndjson_frame(**extracted_fields(extracted)),
+                    ndjson_frame(ai_summary=cached_summary, cached=True, done=True),
+                ]))
+            return {**extracted_fields(extracted), "ai_summary": cached_summary, "cached": True}
+        events = document_events(extracted, summary_key, fresh=fresh)
+
+    # --- Send extracted text to Ollama for summary (map-reduce when it's long) ---
+    if stream:
+        return ndjson_response(summary_frames(events))
+    return await document_result(events)
+
+
 @app.post("/ocr")
-async def extract_text(file: UploadFile = File(...)):
+async def extract_text(file: UploadFile = File(...), fresh: bool = False, stream: bool = False,
+                       run_async: bool = Query(False, alias="async")):
     """
     Handles OCR for images and text extraction for PDFs/DOCX.
-    Then summarizes the extracted content using Ollama.
+    Then summarizes the extracted content using Ollama (?fresh=true skips cached summaries).
+    With ?async=true the file is queued instead and a job id is returned at once; poll
+    GET /jobs/{job_id} for progress and GET /jobs/{job_id}/result for the same body /ocr returns.
+    With ?stream=true the summary is streamed as NDJSON, including the partial summaries
+    of a long document as they complete.
+    The upload is spooled to disk in chunks; files over OCR_MAX_UPLOAD_MB get a 413.
     """
     try:
-        file_bytes = await file.read()
-        filename = file.filename.lower()
+        spooled = await spool_upload(file, OCR_MAX_UPLOAD_MB * 1024 * 1024, UPLOAD_SPOOL_DIR)
+    except UploadTooLarge as e:
+        return JSONResponse(status_code=413, content={"error": str(e)})
+    except Exception as e:
+        return {"error": f"Processing error: {e}"}
+
+    try:
+        if run_async:
+            # The journal takes the spooled file over; it's removed once the job finishes
+            job_id = await app.state.jobs.submit(file.filename, spooled.detach(), fresh=fresh, digest=spooled.digest)
+            return JSONResponse(status_code=202, content={
+                "job_id": job_id,
+                "status": "queued",
+                "status_url": f"/jobs/{job_id}",
+                "result_url": f"/jobs/{job_id}/result",
+            })
+
+        try:
+            result = await ocr_document(file.filename, spooled.path, fresh=fresh, digest=spooled.digest, stream=stream)
+        except PoolFull as e:
+            return JSONResponse(
+                status_code=503,
+                content={"error": f"Server busy, try again shortly ({e})."},
+                headers={"Retry-After": str(EXTRACT_RETRY_AFTER)},
+            )
+        if isinstance(result, StreamingResponse):
+            # The body (and for PDFs the extraction itself) runs after this returns, so the
+            # stream takes the spooled file over and removes it when it ends
+            result.body_iterator = remove_after(result.body_iterator, spooled)
+            spooled = None
+        return result
+
+    except Exception as e:
+        return {"error": f"Processing error: {e}"}
+    finally:
+        if spooled:
+            spooled.remove()
+
+
+async def remove_after(body, spooled):
+    try:
+        async for chunk in body:
+            yield chunk
+    finally:
+        spooled.remove()
 
-        text = ""
 
-        # --- 1️⃣ IMAGE (JPG, PNG) ---
-        if filename.endswith((".jpg", ".jpeg", ".png")):
-            image = Image.open(io.BytesIO(file_bytes)).convert("RGB")
-            np_img = np.array(image)
+# -------------------- Background OCR Jobs --------------------
+async def run_ocr_job(job: dict, path: str, progress) -> dict:
+    """
+    JobQueue handler: the same work as a synchronous /ocr call. Waits for pool capacity
+    instead of answering 503, since nobody is holding a connection open.
+    """
+    while True:
+        try:
+            params = job["params"]
+            result = await ocr_document(job["filename"], path, fresh=params.get("fresh", False),
+                                        progress=progress, digest=params.get("digest"))
+            break
+        except PoolFull:
+            await asyncio.sleep(EXTRACT_RETRY_AFTER)
+    if "error" in result and "extracted_text" not in result:
+        raise RuntimeError(result["error"])
+    return result
 
-            results = reader.readtext(np_img)
-            text = " ".join([res[1] for res in results]).strip()
 
-            if len(text) < 10:
-                tesseract_text = pytesseract.image_to_string(image)
-                if len(tesseract_text.strip()) > len(text):
-                    text = tesseract_text.strip()
+def job_status(job: dict) -> dict:
+    return {
+        "job_id": job["id"],
+        "filename": job["filename"],
+        "status": job["status"],
+        "pages_done": job["pages_done"],
+        "pages_total": job["pages_total"],
+        "error": job["error"],
+        "created": job["created"],
+        "updated": job["updated"],
+    }
 
-        # --- 2️⃣ PDF ---
-        elif filename.endswith(".pdf"):
-            text = ""
-            with pdfplumber.open(io.BytesIO(file_bytes)) as pdf:
-                for page in pdf.pages:
-                    text += page.extract_text() or ""
-            text = text.strip()
 
-        # --- 3️⃣ DOCX ---
-        elif filename.endswith(".docx"):
-            doc = Document(io.BytesIO(file_bytes))
-            text = "\n".join([p.text for p in doc.paragraphs]).strip()
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """
+    Status ("queued", "running", "done" or "failed") and page progress of a background /ocr job.
+    """
+    job = await asyncio.to_thread(app.state.jobs.status, job_id)
+    if job is None:
+        return JSONResponse(status_code=404, content={"error": "Unknown job id."})
+    return job_status(job)
+
 
+@app.get("/jobs/{job_id}/result")
+async def get_job_result(job_id: str):
+    """
+    The /ocr response of a finished job; 202 with the status while it is still queued/running.
+    """
+    job = await asyncio.to_thread(app.state.jobs.status, job_id)
+    if job is None:
+        return JSONResponse(status_code=404, content={"error": "Unknown job id."})
+    if job["status"] == "done":
+        return job["result"]
+    if job["status"] == "failed":
+        return {"error": job["error"]}
+    return JSONResponse(status_code=202, content=job_status(job))
+
+
+# -------------------- Batch OCR Endpoint --------------------
+def batch_summary_prompt(texts: list) -> str:
+    documents = "".join(f"### Document {i}\n{text}\n\n" for i, text in enumerate(texts, start=1))
+    return (
+        "Summarize each of the following documents clearly and concisely.\n"
+        'Reply with a JSON object mapping each document number to its summary, e.g. {"1": "...", "2": "..."}.\n\n'
+        + documents
+    )
+
+
+async def summarize_group(docs: list, fresh: bool = False) -> list:
+    """
+    Summaries for several documents from a single Ollama call, asking for JSON keyed by
+    document number. Any document the model leaves out (or unparseable output) falls back
+    to its own summarize_text() call. `docs` is [(text, summary_key)].
+    """
+    if len(docs) == 1:
+        return [await summarize_text(docs[0][0], docs[0][1], fresh=fresh)]
+
+    prompt = batch_summary_prompt([text for text, _ in docs])
+    reply = cached_reply(prompt, fresh=fresh)
+    if reply is None:
+        r = await ollama_generate(prompt, timeout=OLLAMA_SUMMARY_TIMEOUT * len(docs), fmt="json")
+        reply = (r.json().get("response") or "") if r.status_code == 200 else ""
+    try:
+        # Models sometimes key by "Document 1" rather than "1"
+        by_number = {"".join(ch for ch in str(k) if ch.isdigit()): v for k, v in json.loads(reply).items()}
+    except (ValueError, AttributeError):
+        by_number = {}
+    if by_number:
+        remember_reply(prompt, reply)
+
+    summaries = []
+    for i, (text, summary_key) in enumerate(docs, start=1):
+        summary = by_number.get(str(i))
+        if isinstance(summary, str) and summary.strip():
+            await remember_summary(summary_key, summary)
         else:
-            return {"error": "Unsupported file type. Please upload image, PDF, or DOCX."}
+            summary = await summarize_text(text, summary_key, fresh=fresh)
+        summaries.append(summary)
+    return summaries
 
-        if not text:
-            return {"error": "No readable text found in file."}
 
-        # --- Send extracted text to Ollama for summary ---
-        summary_prompt = f"The following text was extracted from a document:\n\n{text}\n\nPlease summarize it clearly and concisely."
-        payload = {"model": MODEL_NAME, "prompt": summary_prompt, "stream": False}
-        ai_response = requests.post(OLLAMA_URL, json=payload, timeout=120)
+async def read_batch(files: list) -> list:
+    """
+    [SpooledFile] for every uploaded file, with zip archives expanded in place (each member
+    streamed to its own temp file). Raises UploadTooLarge past OCR_BATCH_MAX_FILES files or
+    OCR_BATCH_MAX_MB in total, removing whatever was already spooled.
+    """
+    max_bytes = OCR_BATCH_MAX_MB * 1024 * 1024
+    too_large = f"batch exceeds {OCR_BATCH_MAX_FILES} files or {OCR_BATCH_MAX_MB} MB"
+    documents, total = [], 0
+    try:
+        for upload in files:
+            try:
+                spooled = await spool_upload(upload, max_bytes - total, UPLOAD_SPOOL_DIR)
+            except UploadTooLarge:
+                raise UploadTooLarge(too_large) from None
+            if is_archive(upload.filename):
+                try:
+                    members = await asyncio.to_thread(
+                        unzip_to_disk, spooled.path, OCR_BATCH_MAX_FILES - len(documents), max_bytes - total,
+                        UPLOAD_SPOOL_DIR,
+                    )
+                finally:
+                    spooled.remove()
+            else:
+                members = [spooled]
+            documents.extend(members)
+            total += sum(member.size for member in members)
+            if len(documents) > OCR_BATCH_MAX_FILES:
+                raise UploadTooLarge(too_large)
+    except BaseException:
+        for document in documents:
+            document.remove()
+        raise
+    return documents
+
+
+async def batch_results(documents: list, fresh: bool, batch_summaries: bool):
+    """
+    The /ocr/batch body: batch_frames(), then the spooled files are removed however the stream
+    ends, including a client that disconnects before the first file is finished.
+    """
+    try:
+        async with aclosing(batch_frames(documents, fresh, batch_summaries)) as frames:
+            async for frame in frames:
+                yield frame
+    finally:
+        for document in documents:
+            document.remove()
+
 
-        if ai_response.status_code == 200:
-            data = ai_response.json()
-            summary = data.get("response") or data.get("text") or "⚠️ No AI summary"
-            return {"extracted_text": text, "ai_summary": summary}
+async def batch_frames(documents: list, fresh: bool, batch_summaries: bool):
+    """
+    Extracts (and summarizes) every document concurrently and yields an NDJSON frame per file
+    as soon as it's finished, then a final {"done": true, ...}. Identical files are processed
+    once; their copies are answered with the same result and "duplicate_of".
+    """
+    frames = asyncio.Queue()
+    names_by_key, unique = {}, []
+    for document in documents:
+        try:
+            kind = file_kind(document.name)
+        except UnsupportedFileType:
+            yield ndjson_frame(file=document.name, error="Unsupported file type. Please upload image, PDF, or DOCX.")
+            continue
+        key = (kind, document.digest)
+        if key in names_by_key:
+            names_by_key[key].append(document.name)
         else:
-            return {"extracted_text": text, "error": f"Ollama summary failed: {ai_response.text}"}
+            names_by_key[key] = [document.name]
+            unique.append((kind, document.digest, document.path))
 
-    except Exception as e:
-        return {"error": f"Processing error: {e}"}
+    def emit(key, **result):
+        first, *copies = names_by_key[key]
+        frames.put_nowait(ndjson_frame(file=first, **result))
+        for name in copies:
+            frames.put_nowait(ndjson_frame(file=name, duplicate_of=first, **result))
+
+    # Leave pool capacity for other clients: a batch never holds more than `workers` slots
+    slots = asyncio.Semaphore(app.state.extract_pool.workers)
+    to_summarize = asyncio.Queue()
+
+    async def process(kind, digest, path):
+        key = (kind, digest)
+        fields = {}
+        try:
+            async with slots:
+                while True:
+                    try:
+                        extracted, summary_key, cached_summary = await extract_document(kind, path, digest)
+                        break
+                    except PoolFull:
+                        await asyncio.sleep(1)
+            fields = extracted_fields(extracted)
+            if not extracted.text:
+                emit(key, error="No readable text found in file.")
+            elif cached_summary and not fresh:
+                emit(key, **fields, ai_summary=cached_summary, cached=True)
+            elif batch_summaries:
+                to_summarize.put_nowait((key, extracted, summary_key))
+            else:
+                emit(key, **fields, ai_summary=await summarize_text(extracted.text, summary_key, fresh=fresh))
+        except SummaryFailed as e:
+            emit(key, **fields, error=str(e))
+        except Exception as e:
+            emit(key, error=f"Processing error: {e}")
 
+    async def flush(group):
+        try:
+            summaries = await summarize_group([(e.text, summary_key) for _, e, summary_key in group], fresh=fresh)
+            for (key, extracted, _), summary in zip(group, summaries):
+                emit(key, **extracted_fields(extracted), ai_summary=summary or "⚠️ No AI summary")
+        except Exception as e:
+            for key, extracted, _ in group:
+                emit(key, **extracted_fields(extracted), error=f"Ollama summary failed: {e}")
+
+    async def summarizer():
+        # Packs extracted texts into groups that fit one prompt; each full group is one LLM call
+        group, tokens, running = [], 0, []
+        try:
+            while True:
+                item = await to_summarize.get()
+                if item is None:
+                    break
+                cost = estimate_tokens(item[1].text)
+                if group and (len(group) >= OCR_BATCH_SUMMARY_DOCS or tokens + cost > CONTEXT_TOKENS):
+                    running.append(asyncio.create_task(flush(group)))
+                    group, tokens = [], 0
+                group.append(item)
+                tokens += cost
+            if group:
+                running.append(asyncio.create_task(flush(group)))
+            await asyncio.gather(*running)
+        finally:
+            for task in running:
+                task.cancel()
+
+    async def run_all():
+        summarizing = asyncio.create_task(summarizer())
+        try:
+            await asyncio.gather(*[process(*doc) for doc in unique])
+            to_summarize.put_nowait(None)
+            await summarizing
+        finally:
+            summarizing.cancel()
+            frames.put_nowait(None)
+
+    runner = asyncio.create_task(run_all())
+    try:
+        while (frame := await frames.get()) is not None:
+            yield frame
+        yield ndjson_frame(done=True, files=len(documents), unique=len(unique))
+    finally:
+        # Client went away: stop scheduling work (jobs already in the pool finish there)
+        runner.cancel()
+
+
+@app.post("/ocr/batch")
+async def extract_batch(files: list[UploadFile] = File(...), fresh: bool = False, batch_summaries: bool = False):
+    """
+    Many files (or zip archives of them) in one request. Files are extracted concurrently
+    through the worker pool and results are streamed back as NDJSON, one line per file in
+    completion order. ?batch_summaries=true summarizes several documents per Ollama call.
+    """
+    try:
+        documents = await read_batch(files)
+    except (UploadTooLarge, zipfile.BadZipFile) as e:
+        return JSONResponse(status_code=413 if isinstance(e, UploadTooLarge) else 400, content={"error": str(e)})
+    return StreamingResponse(
+        batch_results(documents, fresh, batch_summaries),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# -------------------- Metrics Endpoint --------------------
+@app.get("/metrics")
+async def metrics():
+    """
+    Extraction pool queue depth and per-job timings (for sizing EXTRACT_WORKERS)
+    and extraction/response cache hit rates.
+    """
+    cache = app.state.extract_cache
+    response_cache = app.state.response_cache
+    return {
+        "extract_pool": app.state.extract_pool.metrics(),
+        "extract_cache": cache.stats() if cache else None,
+        "response_cache": response_cache.stats() if response_cache else None,
+        "ocr": ocr_status(),
+        "jobs": await asyncio.to_thread(app.state.jobs.journal.counts),
+        "conversations": await asyncio.to_thread(app.state.conversations.count),
+    }
 
 
 #uvicorn Python.backend:app --reload
\ No newline at end of file
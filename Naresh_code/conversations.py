@@ -0,0 +1,157 @@
+import json
+import time
+import uuid
+import sqlite3
+import threading
+
+
+class ConversationStore:
+    """
+    SQLite (WAL) store of /chat conversations, so clients send only the new message and a
+    conversation id instead of the whole history on every turn.
+
+    Each message is stored with its token estimate, so tail() picks the newest messages that
+    fit a budget without loading the rest. A conversation can also carry a rolling summary of
+    the messages that no longer fit; `summarized` is how many of the oldest messages it covers.
+    `context` is the token context Ollama returned for the latest reply; it's only valid while
+    `context_at` still equals the message count (nothing was added without a reply).
+    """
+
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS conversations ("
+            " id TEXT PRIMARY KEY, messages INTEGER NOT NULL DEFAULT 0, summary TEXT NOT NULL DEFAULT '',"
+            " summarized INTEGER NOT NULL DEFAULT 0, context TEXT, context_at INTEGER NOT NULL DEFAULT -1,"
+            " created REAL NOT NULL, updated REAL NOT NULL)"
+        )
+        columns = {row["name"] for row in self._db.execute("PRAGMA table_info(conversations)")}
+        if "context" not in columns:  # stores created before context reuse
+            self._db.execute("ALTER TABLE conversations ADD COLUMN context TEXT")
+            self._db.execute("ALTER TABLE conversations ADD COLUMN context_at INTEGER NOT NULL DEFAULT -1")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS messages ("
+            " conversation_id TEXT NOT NULL, seq INTEGER NOT NULL, role TEXT NOT NULL, content TEXT NOT NULL,"
+            " tokens INTEGER NOT NULL, created REAL NOT NULL, PRIMARY KEY (conversation_id, seq))"
+        )
+        self._db.commit()
+
+    def create(self) -> str:
+        conversation_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO conversations (id, created, updated) VALUES (?, ?, ?)", (conversation_id, now, now)
+            )
+            self._db.commit()
+        return conversation_id
+
+    def get(self, conversation_id: str):
+        with self._lock:
+            row = self._db.execute("SELECT * FROM conversations WHERE id = ?", (conversation_id,)).fetchone()
+        if row is None:
+            return None
+        conversation = dict(row)
+        conversation["context"] = json.loads(conversation["context"]) if conversation["context"] else None
+        return conversation
+
+    def append(self, conversation_id: str, messages: list, tokens) -> int:
+        """
+        Appends [{"role", "content"}] in one transaction; `tokens(message)` is the estimate
+        stored with each. Returns the new message count, or None for an unknown conversation.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._db.execute("SELECT messages FROM conversations WHERE id = ?", (conversation_id,)).fetchone()
+            if row is None:
+                return None
+            seq = row["messages"]
+            self._db.executemany(
+                "INSERT INTO messages (conversation_id, seq, role, content, tokens, created) VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (conversation_id, seq + i, m.get("role", "user"), str(m.get("content", "")), tokens(m), now)
+                    for i, m in enumerate(messages)
+                ],
+            )
+            seq += len(messages)
+            self._db.execute("UPDATE conversations SET messages = ?, updated = ? WHERE id = ?", (seq, now, conversation_id))
+            self._db.commit()
+        return seq
+
+    def messages(self, conversation_id: str, start: int = 0, stop: int = None) -> list:
+        """
+        Messages [start:stop] of a conversation, oldest first, as {"role", "content"} dicts.
+        """
+        stop = stop if stop is not None else 2 ** 62
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT role, content FROM messages WHERE conversation_id = ? AND seq >= ? AND seq < ? ORDER BY seq",
+                (conversation_id, start, stop),
+            ).fetchall()
+        return [{"role": row["role"], "content": row["content"]} for row in rows]
+
+    def tail(self, conversation_id: str, budget: int):
+        """
+        (first, messages): the newest messages whose stored token estimates fit in `budget`,
+        oldest first, and the index of the first one. Only token counts are read for the rest.
+        """
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT seq, tokens FROM messages WHERE conversation_id = ? ORDER BY seq DESC", (conversation_id,)
+            ).fetchall()
+        first, used = None, 0
+        for row in rows:
+            if used + row["tokens"] > budget:
+                break
+            used += row["tokens"]
+            first = row["seq"]
+        if first is None:
+            return (rows[0]["seq"] + 1 if rows else 0), []
+        return first, self.messages(conversation_id, first)
+
+    def set_summary(self, conversation_id: str, summary: str, summarized: int):
+        with self._lock:
+            self._db.execute(
+                "UPDATE conversations SET summary = ?, summarized = ? WHERE id = ?", (summary, summarized, conversation_id)
+            )
+            self._db.commit()
+
+    def set_context(self, conversation_id: str, context: list, context_at: int):
+        with self._lock:
+            self._db.execute(
+                "UPDATE conversations SET context = ?, context_at = ? WHERE id = ?",
+                (json.dumps(context), context_at, conversation_id),
+            )
+            self._db.commit()
+
+    def delete(self, conversation_id: str) -> bool:
+        with self._lock:
+            cur = self._db.execute("DELETE FROM conversations WHERE id = ?", (conversation_id,))
+            self._db.execute("DELETE FROM messages WHERE conversation_id = ?", (conversation_id,))
+            self._db.commit()
+        return cur.rowcount > 0
+
+    def prune(self, max_age: float) -> int:
+        """
+        Deletes conversations untouched for `max_age` seconds. Returns how many were removed.
+        """
+        with self._lock:
+            cutoff = time.time() - max_age
+            self._db.execute(
+                "DELETE FROM messages WHERE conversation_id IN (SELECT id FROM conversations WHERE updated < ?)",
+                (cutoff,),
+            )
+            cur = self._db.execute("DELETE FROM conversations WHERE updated < ?", (cutoff,))
+            self._db.commit()
+        return cur.rowcount
+
+    def count(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM conversations").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,147 @@
+import os
+import sys
+import logging
+import threading
+from collections import namedtuple
+from PIL import Image
+from docx import Document
+
+# Shared extraction helpers (doc_extract.py, pdf_ocr.py, ocr_engines.py) live at the repository root;
+# set here too because process-pool workers import this module without backend.py
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _ROOT not in sys.path:
+    sys.path.insert(0, _ROOT)
+from doc_extract import extract_pdf_text
+from image_preprocess import DEFAULT_STEPS as OCR_PREPROCESS
+from ocr_engines import build_router
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+
+# Image OCR engines: "both" (EasyOCR, then tesseract), "easyocr" or "tesseract".
+# "tesseract" never imports torch/EasyOCR at all.
+OCR_ENGINE_CHOICES = ("both", "easyocr", "tesseract")
+OCR_ENGINE = os.getenv("OCR_ENGINE", "both")
+if OCR_ENGINE not in OCR_ENGINE_CHOICES:
+    raise ValueError(f"OCR_ENGINE must be one of {OCR_ENGINE_CHOICES}, got {OCR_ENGINE!r}")
+
+# How the engines are combined per image: "fallback", "fastest" or "race" (see ocr_engines.OcrRouter)
+OCR_POLICY = os.getenv("OCR_POLICY", "fallback")
+OCR_MIN_CONFIDENCE = float(os.getenv("OCR_MIN_CONFIDENCE", "0.6"))
+OCR_RACE_DEADLINE = float(os.getenv("OCR_RACE_DEADLINE", "5"))
+
+# Bump whenever an extractor's output can change, so cached /ocr results are not reused
+# (engine, policy and preprocessing are part of it: the same image OCRs differently with each)
+EXTRACTOR_VERSION = f"5.{OCR_ENGINE}.{OCR_POLICY}.{'+'.join(OCR_PREPROCESS)}"
+
+# Scanned PDF pages (no text layer) are OCR'd with poppler + tesseract
+POPPLER_PATH = os.getenv("POPPLER_PATH") or None
+PDF_OCR = os.getenv("PDF_OCR", "1") == "1"
+PDF_OCR_WORKERS = int(os.getenv("PDF_OCR_WORKERS", "2"))
+
+
+log = logging.getLogger(__name__)
+
+
+class UnsupportedFileType(ValueError):
+    pass
+
+
+# -------------------- OCR Engines --------------------
+# Models load on first use, never at import. One router per process: shared by every thread
+# of a thread pool, built once in each worker of a process pool.
+_ocr = None
+_ocr_lock = threading.Lock()
+
+
+def get_ocr():
+    global _ocr
+    with _ocr_lock:
+        if _ocr is None:
+            _ocr = build_router(
+                OCR_ENGINE, policy=OCR_POLICY, min_confidence=OCR_MIN_CONFIDENCE, deadline=OCR_RACE_DEADLINE,
+            )
+    return _ocr
+
+
+def init_worker():
+    """
+    Process-pool initializer (and OCR_PRELOAD's thread): loads the OCR models before the
+    first job. A failure is only logged, so the worker still handles PDFs and DOCX files and
+    image OCR retries the load (or falls back to tesseract) when it's actually needed.
+    """
+    try:
+        get_ocr().warm()
+    except Exception:
+        log.exception("OCR warm-up failed; models will load on first use")
+
+
+def preload_ocr() -> threading.Thread:
+    """
+    Loads the OCR models on a background thread so startup doesn't wait for torch and
+    the model weights; the first image OCR blocks on the lock only if loading hasn't finished.
+    """
+    thread = threading.Thread(target=init_worker, name="ocr-preload", daemon=True)
+    thread.start()
+    return thread
+
+
+def ocr_status() -> dict:
+    """
+    Engine config, whether EasyOCR is loaded, and per-engine latency/confidence stats
+    (for this process only when EXTRACT_POOL=process).
+    """
+    router = get_ocr()
+    return dict(
+        router.stats(),
+        engine=OCR_ENGINE,
+        easyocr_loaded=any(getattr(e, "loaded", False) for e in router.engines),
+    )
+
+
+# -------------------- Extractors --------------------
+def file_kind(filename: str) -> str:
+    filename = filename.lower()
+    if filename.endswith(IMAGE_EXTENSIONS):
+        return "image"
+    if filename.endswith(".pdf"):
+        return "pdf"
+    if filename.endswith(".docx"):
+        return "docx"
+    raise UnsupportedFileType(filename)
+
+
+def is_archive(filename: str) -> bool:
+    return filename.lower().endswith(".zip")
+
+
+# What every extractor returns: the text, and for PDFs how many pages took each path
+# ({"text": 12, "ocr": 3}; None for other files)
+Extracted = namedtuple("Extracted", ["text", "pages"])
+
+
+# Extractors take a file path (uploads are spooled to disk), so only what a reader
+# actually needs is ever loaded: Pillow decodes from the file, and PDFs are parsed one page at a time.
+def extract_image(path: str) -> Extracted:
+    # Unconverted, so the preprocessor still sees the EXIF orientation
+    with Image.open(path) as image:
+        return Extracted(get_ocr().recognize(image).text, None)
+
+
+def extract_pdf(path: str, progress=None, on_page=None) -> Extracted:
+    # on_page(PageResult) lets a caller start on early pages (e.g. summarize them) while later ones are read
+    text, methods = extract_pdf_text(
+        path, progress=progress, on_page=on_page, ocr=PDF_OCR, poppler_path=POPPLER_PATH, workers=PDF_OCR_WORKERS,
+    )
+    return Extracted(text, methods)
+
+
+def extract_docx(path: str) -> Extracted:
+    doc = Document(path)
+    return Extracted("\n".join([p.text for p in doc.paragraphs]).strip(), None)
+
+
+EXTRACTORS = {
+    "image": extract_image,
+    "pdf": extract_pdf,
+    "docx": extract_docx,
+}
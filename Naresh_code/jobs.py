@@ -0,0 +1,177 @@
+import os
+import json
+import time
+import uuid
+import sqlite3
+import asyncio
+import threading
+
+from uploads import move_file
+
+FINISHED = ("done", "failed")
+
+
+class JobJournal:
+    """
+    SQLite (WAL) journal of background /ocr jobs, so queued work and finished results survive
+    a restart. Each job's upload is kept in `inputs_dir` until the job finishes.
+
+    Progress updates arrive from extraction worker threads, so every call takes the lock.
+    """
+
+    def __init__(self, path: str, inputs_dir: str):
+        self.inputs_dir = inputs_dir
+        os.makedirs(inputs_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY, filename TEXT NOT NULL, params TEXT NOT NULL, status TEXT NOT NULL,"
+            " pages_done INTEGER NOT NULL DEFAULT 0, pages_total INTEGER NOT NULL DEFAULT 0,"
+            " result TEXT, error TEXT, created REAL NOT NULL, updated REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created)")
+        self._db.commit()
+
+    def input_path(self, job_id: str) -> str:
+        return os.path.join(self.inputs_dir, job_id)
+
+    def create(self, filename: str, path: str, params: dict) -> str:
+        """
+        Journals a new queued job, taking ownership of the spooled upload at `path`.
+        """
+        job_id = uuid.uuid4().hex
+        move_file(path, self.input_path(job_id))
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO jobs (id, filename, params, status, created, updated) VALUES (?, ?, ?, 'queued', ?, ?)",
+                (job_id, filename, json.dumps(params), now, now),
+            )
+            self._db.commit()
+        return job_id
+
+    def get(self, job_id: str):
+        with self._lock:
+            row = self._db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["params"] = json.loads(job["params"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def unfinished(self) -> list:
+        """
+        Ids of jobs that never finished, oldest first. Jobs left "running" by a crash are
+        put back to "queued" (extraction is idempotent, so they simply run again).
+        """
+        with self._lock:
+            self._db.execute("UPDATE jobs SET status = 'queued', pages_done = 0 WHERE status = 'running'")
+            self._db.commit()
+            rows = self._db.execute("SELECT id FROM jobs WHERE status = 'queued' ORDER BY created").fetchall()
+        return [row["id"] for row in rows]
+
+    def _update(self, job_id: str, **fields):
+        fields["updated"] = time.time()
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock:
+            self._db.execute(f"UPDATE jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+            self._db.commit()
+
+    def start(self, job_id: str):
+        self._update(job_id, status="running")
+
+    def progress(self, job_id: str, done: int, total: int):
+        self._update(job_id, pages_done=done, pages_total=total)
+
+    def finish(self, job_id: str, result: dict):
+        self._update(job_id, status="done", result=json.dumps(result, ensure_ascii=False))
+        self._drop_input(job_id)
+
+    def fail(self, job_id: str, error: str):
+        self._update(job_id, status="failed", error=error)
+        self._drop_input(job_id)
+
+    def _drop_input(self, job_id: str):
+        try:
+            os.remove(self.input_path(job_id))
+        except FileNotFoundError:
+            pass
+
+    def prune(self, max_age: float) -> int:
+        """
+        Forgets finished jobs older than `max_age` seconds. Returns how many were removed.
+        """
+        with self._lock:
+            cur = self._db.execute(
+                "DELETE FROM jobs WHERE status IN ('done', 'failed') AND updated < ?", (time.time() - max_age,)
+            )
+            self._db.commit()
+        return cur.rowcount
+
+    def counts(self) -> dict:
+        with self._lock:
+            rows = self._db.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        return {row["status"]: row["n"] for row in rows}
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class JobQueue:
+    """
+    In-process queue of journaled jobs worked off by `workers` asyncio tasks.
+
+    `handler(job, path, progress)` is awaited for each job and returns its result dict;
+    `progress(done, total)` may be called from any thread. An exception marks the job failed.
+    """
+
+    def __init__(self, journal: JobJournal, handler, workers: int = 2, max_age: float = 24 * 3600):
+        self.journal = journal
+        self.handler = handler
+        self.workers = workers
+        self.max_age = max_age
+        self._queue = asyncio.Queue()
+        self._tasks = []
+
+    async def start(self):
+        await asyncio.to_thread(self.journal.prune, self.max_age)
+        for job_id in await asyncio.to_thread(self.journal.unfinished):
+            self._queue.put_nowait(job_id)
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    async def submit(self, filename: str, path: str, **params) -> str:
+        job_id = await asyncio.to_thread(self.journal.create, filename, path, params)
+        self._queue.put_nowait(job_id)
+        return job_id
+
+    def status(self, job_id: str):
+        return self.journal.get(job_id)
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _work(self):
+        while True:
+            job_id = await self._queue.get()
+            job = await asyncio.to_thread(self.journal.get, job_id)
+            if job is None or job["status"] in FINISHED:
+                continue
+            try:
+                path = self.journal.input_path(job_id)
+                if not os.path.exists(path):
+                    raise FileNotFoundError("the uploaded file for this job is gone")
+                await asyncio.to_thread(self.journal.start, job_id)
+                result = await self.handler(job, path, lambda done, total: self.journal.progress(job_id, done, total))
+            except asyncio.CancelledError:
+                raise  # shutting down: the job stays "running" and is requeued on the next start
+            except Exception as e:
+                await asyncio.to_thread(self.journal.fail, job_id, str(e) or type(e).__name__)
+            else:
+                await asyncio.to_thread(self.journal.finish, job_id, result)
@@ -0,0 +1,114 @@
+import os
+import shutil
+import asyncio
+import hashlib
+import zipfile
+import tempfile
+
+CHUNK_SIZE = 1024 * 1024
+
+
+class UploadTooLarge(ValueError):
+    pass
+
+
+class SpooledFile:
+    """
+    An upload (or archive member) written to a temporary file. `digest` is its SHA-256,
+    computed while writing so the content is never read twice. remove() deletes the file
+    unless it has been handed off with detach().
+    """
+
+    def __init__(self, name: str, path: str, size: int, digest: str):
+        self.name = name
+        self.path = path
+        self.size = size
+        self.digest = digest
+
+    def detach(self) -> str:
+        path, self.path = self.path, None
+        return path
+
+    def remove(self):
+        if self.path:
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+            self.path = None
+
+
+def _temp_path(name: str, spool_dir: str = None) -> str:
+    # Keep the extension: some readers sniff it
+    fd, path = tempfile.mkstemp(suffix=os.path.splitext(name)[1].lower(), dir=spool_dir)
+    os.close(fd)
+    return path
+
+
+async def spool_upload(upload, max_bytes: int, spool_dir: str = None) -> SpooledFile:
+    """
+    Copies an UploadFile to disk in CHUNK_SIZE pieces, so memory use doesn't grow with the
+    file. Raises UploadTooLarge (and leaves nothing behind) past `max_bytes`.
+    """
+    path = _temp_path(upload.filename or "", spool_dir)
+    sha, size = hashlib.sha256(), 0
+    try:
+        with open(path, "wb") as out:
+            while chunk := await upload.read(CHUNK_SIZE):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge(f"{upload.filename} is larger than {max_bytes // (1024 * 1024)} MB")
+                sha.update(chunk)
+                await asyncio.to_thread(out.write, chunk)
+    except BaseException:
+        os.remove(path)
+        raise
+    return SpooledFile(upload.filename, path, size, sha.hexdigest())
+
+
+def unzip_to_disk(archive_path: str, max_files: int, max_bytes: int, spool_dir: str = None) -> list:
+    """
+    [SpooledFile] for the files inside a zip archive, skipping folders and macOS metadata.
+    Members are streamed to their own temp files; sizes are checked from the archive's
+    directory before anything is decompressed, so a zip bomb is refused up front.
+    """
+    with zipfile.ZipFile(archive_path) as archive:
+        members = [
+            info for info in archive.infolist()
+            if not info.is_dir() and not info.filename.startswith("__MACOSX/")
+            and not os.path.basename(info.filename).startswith(".")
+        ]
+        if len(members) > max_files:
+            raise UploadTooLarge(f"archive has {len(members)} files (limit {max_files})")
+        total = sum(info.file_size for info in members)
+        if total > max_bytes:
+            raise UploadTooLarge(
+                f"archive expands to {total // (1024 * 1024)} MB (limit {max_bytes // (1024 * 1024)} MB)"
+            )
+
+        spooled = []
+        try:
+            for info in members:
+                path = _temp_path(info.filename, spool_dir)
+                spooled.append(SpooledFile(info.filename, path, info.file_size, None))
+                sha = hashlib.sha256()
+                with archive.open(info) as src, open(path, "wb") as out:
+                    while chunk := src.read(CHUNK_SIZE):
+                        sha.update(chunk)
+                        out.write(chunk)
+                spooled[-1].digest = sha.hexdigest()
+        except BaseException:
+            for item in spooled:
+                item.remove()
+            raise
+        return spooled
+
+
+def move_file(path: str, dest: str):
+    """
+    os.replace when possible, a copy when the temp dir is on another filesystem.
+    """
+    try:
+        os.replace(path, dest)
+    except OSError:
+        shutil.move(path, dest)
@@ -0,0 +1,138 @@
+import os
+import time
+import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+
+class PoolFull(Exception):
+    pass
+
+
+def _timed_call(fn, *args):
+    """
+    Runs in the worker. Wall-clock stamps (not perf_counter) so they stay comparable across processes.
+    """
+    started = time.time()
+    result = fn(*args)
+    return result, started, time.time()
+
+
+class WorkerPool:
+    """
+    Runs blocking CPU work (OCR, PDF/DOCX parsing) off the event loop.
+
+    At most `workers` jobs run at once and at most `max_queue` more wait for a slot;
+    anything beyond that is rejected with PoolFull instead of piling up in memory.
+    """
+
+    def __init__(self, kind: str = "thread", workers: int = 0, max_queue: int = 16,
+                 initializer=None, history: int = 200):
+        self.kind = kind
+        self.workers = workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+        executor_cls = ProcessPoolExecutor if kind == "process" else ThreadPoolExecutor
+        self._executor = executor_cls(max_workers=self.workers, initializer=initializer)
+
+        # Only touched from the event loop thread, so no lock is needed
+        self._pending = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.max_depth_seen = 0
+        self._jobs = deque(maxlen=history)
+
+    @property
+    def running(self) -> int:
+        return min(self._pending, self.workers)
+
+    @property
+    def queued(self) -> int:
+        return max(0, self._pending - self.workers)
+
+    async def submit(self, fn, *args, label: str = ""):
+        return await self.start(fn, *args, label=label)
+
+    def start(self, fn, *args, label: str = "") -> asyncio.Future:
+        """
+        Like submit(), but raises PoolFull right away and returns a future for the result,
+        for callers that do other work while the job runs. Must be called on the event loop.
+        """
+        if self._pending >= self.workers + self.max_queue:
+            self.rejected += 1
+            raise PoolFull(f"{self.queued} jobs already waiting for {self.workers} workers")
+
+        self._pending += 1
+        self.submitted += 1
+        self.max_depth_seen = max(self.max_depth_seen, self.queued)
+        enqueued = time.time()
+        loop = asyncio.get_running_loop()
+
+        # Release the slot when the worker actually finishes, not when the caller stops waiting,
+        # so a cancelled request cannot let more jobs in than there are slots.
+        future = self._executor.submit(_timed_call, fn, *args)
+        future.add_done_callback(lambda _: self._release_threadsafe(loop))
+        return asyncio.ensure_future(self._record(future, enqueued, label))
+
+    async def _record(self, future, enqueued: float, label: str):
+        try:
+            result, started, finished = await asyncio.wrap_future(future)
+        except Exception:
+            self.failed += 1
+            self._jobs.append({"label": label, "ok": False, "total_s": time.time() - enqueued})
+            raise
+
+        self.completed += 1
+        self._jobs.append({
+            "label": label,
+            "ok": True,
+            "queue_s": max(0.0, started - enqueued),
+            "run_s": finished - started,
+        })
+        return result
+
+    def _release(self):
+        self._pending -= 1
+
+    def _release_threadsafe(self, loop):
+        try:
+            loop.call_soon_threadsafe(self._release)
+        except RuntimeError:
+            pass  # event loop already closed during shutdown
+
+    def metrics(self, recent: int = 20) -> dict:
+        jobs = [j for j in self._jobs if j["ok"]]
+        run_times = sorted(j["run_s"] for j in jobs)
+        waits = [j["queue_s"] for j in jobs]
+
+        by_label = {}
+        for j in jobs:
+            stats = by_label.setdefault(j["label"], {"jobs": 0, "run_s_total": 0.0})
+            stats["jobs"] += 1
+            stats["run_s_total"] += j["run_s"]
+        for stats in by_label.values():
+            stats["run_s_avg"] = round(stats.pop("run_s_total") / stats["jobs"], 4)
+
+        return {
+            "kind": self.kind,
+            "workers": self.workers,
+            "cpu_count": os.cpu_count(),
+            "max_queue": self.max_queue,
+            "running": self.running,
+            "queued": self.queued,
+            "max_queued_seen": self.max_depth_seen,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "run_s_avg": round(sum(run_times) / len(run_times), 4) if run_times else 0.0,
+            "run_s_p95": round(run_times[int(0.95 * (len(run_times) - 1))], 4) if run_times else 0.0,
+            "queue_s_avg": round(sum(waits) / len(waits), 4) if waits else 0.0,
+            "queue_s_max": round(max(waits), 4) if waits else 0.0,
+            "by_label": by_label,
+            "recent_jobs": list(self._jobs)[-recent:],
+        }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
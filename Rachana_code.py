@@ -1,16 +1,34 @@
 import streamlit as st
 import time
+import asyncio
 import ollama
-import pytesseract
 from PIL import Image
-from pdf2image import convert_from_bytes
+from collections import Counter
+from doc_extract import iter_pdf_pages, describe_methods
+from ocr_engines import get_router
+from response_cache import ResponseCache
+from context_window import estimate_tokens
+from summarizer import MapReduceSummarizer, chunk_budget
+from model_manager import get_manager
 
 # --- Configuration ---
 POPPLER_PATH = r"C:\Release-25.07.0-0\poppler-25.07.0\Library\bin"  # ✅ Update this path
-pytesseract.pytesseract.tesseract_cmd = r"C:\Program Files\Tesseract-OCR\tesseract.exe"  # ✅ Update if needed
+OCR_WORKERS = 0  # parallel PDF pages; 0 = one per CPU core
+SUMMARY_PARALLEL = 2  # chunk summaries requested at once for documents longer than one prompt
+OLLAMA_HOST = "http://localhost:11434"  # the server the ollama client talks to by default
+MODELS = ["llama2", "gemma", "mistral"]  # preloaded at startup, in this order
 
 st.set_page_config(page_title="Rachana's ChatGPT", page_icon="🤖", layout="wide")
 
+
+@st.cache_resource
+def get_summary_cache():
+    # Chunk summaries are shared across sessions: re-uploading a long document costs only the final merge
+    return ResponseCache()
+
+
+model_manager = get_manager(OLLAMA_HOST, preload=MODELS)
+
 # --- Custom CSS ---
 st.markdown("""
 <style>
@@ -59,7 +77,8 @@ def get_bot_response(prompt):
         stream = ollama.chat(
             model=st.session_state.model_name,
             messages=[{'role': 'user', 'content': prompt}],
-            stream=True
+            stream=True,
+            keep_alive=model_manager.use(st.session_state.model_name)
         )
         response_text = ""
         for chunk in stream:
@@ -69,14 +88,102 @@ def get_bot_response(prompt):
     except Exception as e:
         yield f"⚠️ Error: {e}"
 
+
+def summarize_long_text(text, status, tick=None):
+    """
+    Map-reduce summary of a document too long for one prompt. Chunks are summarized
+    concurrently and each partial summary is shown in `status` as soon as it's ready.
+    `text` may also be an iterable of pages still being read; `tick()` is then called a few
+    times a second so the caller can show reading progress (Streamlit can't be updated from
+    the thread that reads the pages).
+    An Ollama failure is returned as a "⚠️ Error" reply, like get_bot_response().
+    """
+    model = st.session_state.model_name
+
+    keep_alive = model_manager.use(model)
+
+    async def run():
+        async with ollama.AsyncClient() as client:
+
+            async def generate(prompt):
+                response = await client.generate(model=model, prompt=prompt, keep_alive=keep_alive)
+                return response["response"]
+
+            async def ticker():
+                while True:
+                    tick()
+                    await asyncio.sleep(0.25)
+
+            summarizer = MapReduceSummarizer(generate, model=model, parallel=SUMMARY_PARALLEL, cache=get_summary_cache())
+            ticking = asyncio.create_task(ticker()) if tick else None
+            done = 0
+            try:
+                async for event in summarizer.stream(text):
+                    if event.kind == "chunk":
+                        done += 1
+                        status.update(label=f"📝 Summarized {done} of {event.total or '?'} parts...")
+                        status.markdown(f"**Part {event.index + 1}:** {event.text}")
+                    else:
+                        status.update(label=f"📝 Summarized {done} parts" if done else "📝 Summarized",
+                                      state="complete", expanded=False)
+                        return event.text
+            finally:
+                if ticking:
+                    ticking.cancel()
+                    tick()
+
+    try:
+        return asyncio.run(run())
+    except Exception as e:
+        status.update(label="⚠️ Summary failed", state="error", expanded=False)
+        return f"⚠️ Error: {e}"
+
+
+def summarize_pdf(pdf_bytes, progress, status):
+    """
+    Reads a PDF and summarizes it at the same time: the first parts are summarized while
+    later pages are still being read or OCR'd. Returns (text, summary, {method: pages}).
+    If summarizing fails, the rest of the PDF is still read and the summary is the error reply;
+    a PDF that can't be read raises.
+    """
+    texts, methods, latest, failed = [], Counter(), [], []
+
+    def read():
+        # Text-layer pages are read directly; only scanned pages are rasterized + OCR'd (in parallel)
+        try:
+            for page in iter_pdf_pages(pdf_bytes, poppler_path=POPPLER_PATH, workers=OCR_WORKERS):
+                texts.append(page.text)
+                methods[page.method] += 1
+                latest[:] = [page]
+                yield page.text
+        except Exception as e:
+            failed.append(e)
+            raise
+
+    def show_progress():
+        if latest:
+            page = latest[0]
+            progress.progress(page.number / page.total, text=f"🔍 Page {page.number}/{page.total} ({page.method})")
+
+    pages = read()
+    summary = summarize_long_text(pages, status, tick=show_progress)
+    if failed:
+        raise failed[0]
+    for _ in pages:
+        # Summarizing stopped early: keep reading so the whole text is still shown
+        show_progress()
+    return "\n".join(texts), summary, methods
+
 # --- Sidebar ---
 with st.sidebar:
     st.header("⚙️ Chat Settings")
 
     st.session_state.model_name = st.selectbox(
         "Choose a Model",
-        ["llama2", "gemma", "mistral"],
-        index=["llama2", "gemma", "mistral"].index(st.session_state.model_name)
+        MODELS,
+        index=MODELS.index(st.session_state.model_name),
+        format_func=model_manager.label,
+        help="🔥 warm models are loaded and answer right away; ❄️ cold ones load on first use"
     )
 
     st.write("---")
@@ -141,16 +248,21 @@ st.markdown('</div>', unsafe_allow_html=True)
 if uploaded_file is not None and uploaded_file.name != st.session_state.last_processed_file_name:
     file_name = uploaded_file.name.lower()
     extracted_text = ""
+    response_text = None  # PDFs are summarized while they're read
 
     try:
         if file_name.endswith((".jpg", ".jpeg", ".png")):
             image = Image.open(uploaded_file)
-            extracted_text = pytesseract.image_to_string(image)
+            extracted_text = get_router().recognize(image).text
         elif file_name.endswith(".pdf"):
             pdf_bytes = uploaded_file.read()
-            pages = convert_from_bytes(pdf_bytes, poppler_path=POPPLER_PATH)
-            for page in pages:
-                extracted_text += pytesseract.image_to_string(page)
+            progress = st.progress(0.0, text="🔍 Reading PDF...")
+            status = st.status("📝 Summarizing while the PDF is read...", expanded=True)
+            try:
+                extracted_text, response_text, methods = summarize_pdf(pdf_bytes, progress, status)
+            finally:
+                progress.empty()
+            st.caption(f"📑 {describe_methods(methods)}")
 
         if extracted_text.strip():
             ocr_prompt = f"Here is text from {uploaded_file.name}. Summarize it:\n\n---\n{extracted_text}\n---"
@@ -159,10 +271,18 @@ if uploaded_file is not None and uploaded_file.name != st.session_state.last_pro
                 st.markdown(f"📄 **Extracted text from {uploaded_file.name}:**\n\n{extracted_text[:1000]}...")
 
             with st.chat_message("assistant"):
-                response_text = ""
-                for chunk in get_bot_response(ocr_prompt):
-                    response_text += chunk
-                    st.markdown(chunk)
+                if response_text is not None:
+                    st.markdown(response_text)
+                elif estimate_tokens(ocr_prompt) <= chunk_budget(st.session_state.model_name):
+                    response_text = ""
+                    for chunk in get_bot_response(ocr_prompt):
+                        response_text += chunk
+                        st.markdown(chunk)
+                else:
+                    # Too long for one prompt: summarize parts in parallel, then merge them
+                    status = st.status("📝 Summarizing document in parts...", expanded=True)
+                    response_text = summarize_long_text(extracted_text, status)
+                    st.markdown(response_text)
 
             # Update session state
             st.session_state.last_processed_file_name = uploaded_file.name
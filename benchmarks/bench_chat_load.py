@@ -0,0 +1,61 @@
+"""
+Load benchmark for the FastAPI backend's /chat endpoint.
+
+Fires N simultaneous clients at a running backend and reports throughput and latency,
+so blocking calls on the event loop show up as flat throughput when N grows.
+
+    uvicorn backend:app            # from Naresh_code/
+    python benchmarks/bench_chat_load.py --clients 1 4 16 --requests 5
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+
+async def run_client(client, url, message, n_requests, latencies, errors):
+    for _ in range(n_requests):
+        start = time.perf_counter()
+        try:
+            r = await client.post(url, json={"message": message, "history": []})
+            r.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+        except Exception:
+            errors.append(time.perf_counter() - start)
+
+
+async def run_level(url, message, n_clients, n_requests, timeout):
+    latencies, errors = [], []
+    limits = httpx.Limits(max_connections=n_clients, max_keepalive_connections=n_clients)
+    async with httpx.AsyncClient(timeout=timeout, limits=limits) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*[
+            run_client(client, url, message, n_requests, latencies, errors)
+            for _ in range(n_clients)
+        ])
+        wall = time.perf_counter() - start
+    return wall, latencies, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8000/chat")
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--requests", type=int, default=3, help="requests per client")
+    parser.add_argument("--message", default="Reply with one short sentence.")
+    parser.add_argument("--timeout", type=float, default=300)
+    args = parser.parse_args()
+
+    print(f"{'clients':>8} {'ok':>5} {'err':>5} {'wall s':>8} {'req/s':>8} {'p50 s':>8} {'p95 s':>8}")
+    for n in args.clients:
+        wall, lat, err = asyncio.run(run_level(args.url, args.message, n, args.requests, args.timeout))
+        lat_sorted = sorted(lat) or [0.0]
+        p50 = statistics.median(lat_sorted)
+        p95 = lat_sorted[min(len(lat_sorted) - 1, int(0.95 * len(lat_sorted)))]
+        print(f"{n:>8} {len(lat):>5} {len(err):>5} {wall:>8.2f} {len(lat) / wall:>8.2f} {p50:>8.2f} {p95:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
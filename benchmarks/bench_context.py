@@ -0,0 +1,78 @@
+"""
+Prompt latency vs. chat length, with and without the token-budgeted context window.
+
+Builds synthetic conversations of growing length and sends each to Ollama's /api/chat twice:
+once with the full history (what the apps used to do) and once through fit_messages().
+With the window, prompt tokens and latency should stay flat once the budget is reached.
+
+    python benchmarks/bench_context.py --model phi3 --turns 4 16 64 256
+    python benchmarks/bench_context.py --dry-run      # token estimates only, no Ollama needed
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from context_window import context_budget, fit_messages, message_tokens  # noqa: E402
+
+WORDS = "policy coverage claim premium deductible insured clause renewal benefit exclusion rider term".split()
+
+
+def synthetic_chat(turns: int, words_per_message: int, seed: int) -> list:
+    rng = random.Random(seed)
+    messages = [{"role": "system", "content": "You are a helpful assistant."}]
+    for i in range(turns):
+        role = "user" if i % 2 == 0 else "assistant"
+        messages.append({"role": role, "content": " ".join(rng.choice(WORDS) for _ in range(words_per_message))})
+    messages.append({"role": "user", "content": "Summarize our discussion in one sentence."})
+    return messages
+
+
+def timed_chat(url: str, model: str, messages: list) -> tuple:
+    start = time.perf_counter()
+    r = requests.post(
+        f"{url}/api/chat",
+        json={"model": model, "messages": messages, "stream": False, "options": {"num_predict": 16}},
+        timeout=600,
+    )
+    r.raise_for_status()
+    data = r.json()
+    return time.perf_counter() - start, data.get("prompt_eval_count", 0), data.get("prompt_eval_duration", 0) / 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:11434")
+    parser.add_argument("--model", default="phi3")
+    parser.add_argument("--turns", type=int, nargs="+", default=[4, 16, 64, 256])
+    parser.add_argument("--words", type=int, default=60, help="words per synthetic message")
+    parser.add_argument("--budget", type=int, default=0, help="token budget (default: from model)")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    budget = args.budget or context_budget(args.model)
+    print(f"model={args.model} budget={budget} tokens")
+    header = f"{'turns':>6} {'est full':>9} {'est win':>8}"
+    if not args.dry_run:
+        header += f" {'full s':>8} {'full eval':>10} {'win s':>8} {'win eval':>9}"
+    print(header)
+
+    for seed, turns in enumerate(args.turns):
+        full = synthetic_chat(turns, args.words, seed)
+        windowed = fit_messages(full, budget=budget)
+        row = f"{turns:>6} {sum(map(message_tokens, full)):>9} {sum(map(message_tokens, windowed)):>8}"
+        if not args.dry_run:
+            full_s, full_eval, _ = timed_chat(args.url, args.model, full)
+            # distinct seed so Ollama can't reuse the prompt cache from the full run
+            windowed = fit_messages(synthetic_chat(turns, args.words, seed + 1000), budget=budget)
+            win_s, win_eval, _ = timed_chat(args.url, args.model, windowed)
+            row += f" {full_s:>8.2f} {full_eval:>10} {win_s:>8.2f} {win_eval:>9}"
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Per-turn /chat latency for each CHAT_ENGINE, i.e. with and without reuse of Ollama's KV cache.
+
+Launches `uvicorn backend:app` from Naresh_code/ once per engine, starts a stored conversation
+seeded with a synthetic document (so every turn carries a long history), sends the same
+questions in order and reports each turn's latency:
+
+    generate  the flattened transcript is re-sent and re-evaluated from scratch every turn
+    chat      structured /api/chat messages; Ollama reuses the KV cache of the unchanged prefix
+    context   only the new turn plus the previous turn's `context` is sent
+
+Needs a running Ollama with MODEL_NAME pulled. The model is warmed up first unless --cold.
+
+    python benchmarks/bench_kv_reuse.py --turns 8 --doc-words 1500
+    python benchmarks/bench_kv_reuse.py --engines generate context --keep-alive 30m --model phi3:mini
+"""
+import os
+import sys
+import time
+import random
+import socket
+import argparse
+import statistics
+import subprocess
+
+import httpx
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Naresh_code")
+
+WORDS = ("policy coverage claim premium deductible insured clause renewal benefit exclusion rider term "
+         "hospital treatment period waiting sum annual member nominee document").split()
+QUESTIONS = [
+    "What is this document about?",
+    "List the exclusions it mentions.",
+    "How long is the waiting period?",
+    "Who is the nominee?",
+    "Summarize the renewal terms in one sentence.",
+    "Which benefits apply to hospital treatment?",
+    "Is there a deductible?",
+    "What should a member do to file a claim?",
+]
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def synthetic_document(words: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    sentences = [" ".join(rng.choice(WORDS) for _ in range(12)).capitalize() + "." for _ in range(words // 12)]
+    return " ".join(sentences)
+
+
+def wait_ready(proc, base: str, timeout: float):
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        if proc.poll() is not None:
+            raise RuntimeError(f"backend exited with code {proc.returncode}")
+        try:
+            if httpx.get(f"{base}/metrics", timeout=1).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.1)
+    raise RuntimeError("backend did not start")
+
+
+def run_engine(engine: str, args, document: str) -> list:
+    port = free_port()
+    base = f"http://127.0.0.1:{port}"
+    env = dict(
+        os.environ, CHAT_ENGINE=engine, OLLAMA_KEEP_ALIVE=args.keep_alive, RESPONSE_CACHE="0",
+        CONVERSATIONS_PATH=os.path.join(args.workdir, f"bench_kv_{engine}.sqlite3"),
+    )
+    if args.model:
+        env["MODEL_NAME"] = args.model
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env,
+    )
+    try:
+        wait_ready(proc, base, args.timeout)
+        with httpx.Client(base_url=base, timeout=args.timeout) as client:
+            if not args.cold:
+                client.post("/chat", json={"message": "Hello", "history": []}).raise_for_status()
+            seed = [
+                {"role": "user", "content": f"Here is a policy document:\n\n{document}"},
+                {"role": "assistant", "content": "I've read the document. What would you like to know?"},
+            ]
+            conversation_id = client.post("/conversations", json={"messages": seed}).json()["conversation_id"]
+            latencies = []
+            for turn in range(args.turns):
+                start = time.perf_counter()
+                r = client.post("/chat", json={"message": QUESTIONS[turn % len(QUESTIONS)],
+                                               "conversation_id": conversation_id, "fresh": True})
+                r.raise_for_status()
+                latencies.append(time.perf_counter() - start)
+            client.delete(f"/conversations/{conversation_id}")
+        return latencies
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--engines", nargs="+", default=["generate", "chat", "context"])
+    parser.add_argument("--turns", type=int, default=6)
+    parser.add_argument("--doc-words", type=int, default=1200, help="size of the document the conversation starts with")
+    parser.add_argument("--keep-alive", default="30m", help="OLLAMA_KEEP_ALIVE for the backend")
+    parser.add_argument("--model", help="MODEL_NAME for the backend (default: its own default)")
+    parser.add_argument("--cold", action="store_true", help="don't warm the model up before the first turn")
+    parser.add_argument("--workdir", default=".", help="where the benchmark's conversation stores are written")
+    parser.add_argument("--timeout", type=float, default=300)
+    args = parser.parse_args()
+
+    document = synthetic_document(args.doc_words)
+    results = {engine: run_engine(engine, args, document) for engine in args.engines}
+
+    print(f"{'turn':>4} " + " ".join(f"{engine:>10}" for engine in args.engines))
+    for turn in range(args.turns):
+        print(f"{turn + 1:>4} " + " ".join(f"{results[engine][turn]:>9.2f}s" for engine in args.engines))
+    if args.turns > 1:
+        # Turn 1 evaluates the whole history for every engine; reuse shows from turn 2 on
+        print(f"{'2+':>4} " + " ".join(f"{statistics.mean(results[e][1:]):>9.2f}s" for e in args.engines)
+              + "   (mean of turns 2..n)")
+
+
+if __name__ == "__main__":
+    main()
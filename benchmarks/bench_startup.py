@@ -0,0 +1,79 @@
+"""
+Import-to-ready latency of the FastAPI backend, per OCR configuration.
+
+Launches `uvicorn backend:app` from Naresh_code/ with each OCR_ENGINE / OCR_PRELOAD combination,
+polls GET /metrics until it answers and reports how long that took. With --until-ocr it keeps
+polling until /metrics shows the EasyOCR reader loaded (only meaningful with OCR_PRELOAD=1).
+
+    python benchmarks/bench_startup.py --engines tesseract both --preload 0 1
+    python benchmarks/bench_startup.py --engines both --preload 1 --until-ocr
+"""
+import os
+import sys
+import time
+import socket
+import argparse
+import subprocess
+
+import httpx
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Naresh_code")
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def time_startup(engine: str, preload: str, until_ocr: bool, timeout: float) -> tuple:
+    port = free_port()
+    env = dict(os.environ, OCR_ENGINE=engine, OCR_PRELOAD=preload)
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env,
+    )
+    ready = ocr_ready = None
+    try:
+        while time.perf_counter() - start < timeout:
+            if proc.poll() is not None:
+                raise RuntimeError(f"backend exited with code {proc.returncode}")
+            try:
+                r = httpx.get(f"http://127.0.0.1:{port}/metrics", timeout=1)
+                if r.status_code == 200:
+                    ready = ready or time.perf_counter() - start
+                    if not until_ocr or r.json()["ocr"]["easyocr_loaded"]:
+                        ocr_ready = time.perf_counter() - start if until_ocr else None
+                        break
+            except httpx.TransportError:
+                pass
+            time.sleep(0.05)
+    finally:
+        proc.terminate()
+        proc.wait()
+    return ready, ocr_ready
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--engines", nargs="+", default=["tesseract", "both"])
+    parser.add_argument("--preload", nargs="+", default=["0", "1"])
+    parser.add_argument("--until-ocr", action="store_true")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--timeout", type=float, default=300)
+    args = parser.parse_args()
+
+    print(f"{'engine':>10} {'preload':>8} {'ready s':>8}" + (f" {'ocr ready s':>12}" if args.until_ocr else ""))
+    for engine in args.engines:
+        for preload in args.preload:
+            for _ in range(args.repeat):
+                ready, ocr_ready = time_startup(engine, preload, args.until_ocr, args.timeout)
+                row = f"{engine:>10} {preload:>8} " + (f"{ready:>8.2f}" if ready else f"{'timeout':>8}")
+                if args.until_ocr:
+                    row += f" {ocr_ready:>12.2f}" if ocr_ready else f" {'-':>12}"
+                print(row)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Wall-clock cost of rendering a streamed reply: the old per-token loop vs StreamRenderer.
+
+The old Bharath_code.py loop re-rendered the whole reply HTML, injected a <script> block and
+slept 20 ms for every token. This replays synthetic replies of growing length through both
+loops against a stand-in placeholder that serializes each frame (as Streamlit does before
+shipping it to the browser), and reports time, frames and bytes sent.
+
+    python benchmarks/bench_stream_render.py --tokens 100 500 1000
+    python benchmarks/bench_stream_render.py --tokens 1000 --token-delay 0.01   # simulate generation speed
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from stream_render import StreamRenderer  # noqa: E402
+
+SCROLL_JS = ("<script>var chatDiv = window.parent.document.querySelector('.chat-container');"
+             "if(chatDiv){chatDiv.scrollTop = chatDiv.scrollHeight;}</script>")
+
+
+class FakePlaceholder:
+    def __init__(self):
+        self.frames = 0
+        self.bytes = 0
+
+    def markdown(self, body, unsafe_allow_html=False):
+        self.frames += 1
+        self.bytes += len(body.encode("utf-8"))
+
+
+def tokens_for(n):
+    words = "the policy covers hospitalisation expenses up to the sum insured".split()
+    return [words[i % len(words)] + " " for i in range(n)]
+
+
+def old_loop(tokens, token_delay):
+    text_placeholder, page = FakePlaceholder(), FakePlaceholder()
+    full_reply = ""
+    for token in tokens:
+        time.sleep(token_delay)
+        full_reply += token
+        text_placeholder.markdown(f"<div class='chat-bubble assistant typing-cursor'>{full_reply}</div>", True)
+        page.markdown(SCROLL_JS, True)
+        time.sleep(0.02)
+    return text_placeholder.frames + page.frames, text_placeholder.bytes + page.bytes
+
+
+def new_loop(tokens, token_delay):
+    # Same frames as Bharath_code.py: the typing cursor until close() draws the finished bubble
+    text_placeholder = FakePlaceholder()
+    renderer = StreamRenderer(lambda text, final: text_placeholder.markdown(
+        f"<div class='chat-bubble assistant'>{text}</div>" if final
+        else f"<div class='chat-bubble assistant typing-cursor'>{text}</div>", True))
+    for token in tokens:
+        time.sleep(token_delay)
+        renderer.add(token)
+    renderer.close()
+    return text_placeholder.frames, text_placeholder.bytes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tokens", type=int, nargs="+", default=[100, 500, 1000])
+    parser.add_argument("--token-delay", type=float, default=0.0, help="seconds between tokens from the model")
+    args = parser.parse_args()
+
+    print(f"{'tokens':>7} {'old s':>8} {'old frames':>11} {'old KB':>9} {'new s':>8} {'new frames':>11} {'new KB':>8}")
+    for n in args.tokens:
+        tokens = tokens_for(n)
+        start = time.perf_counter()
+        old_frames, old_bytes = old_loop(tokens, args.token_delay)
+        old_s = time.perf_counter() - start
+        start = time.perf_counter()
+        new_frames, new_bytes = new_loop(tokens, args.token_delay)
+        new_s = time.perf_counter() - start
+        print(f"{n:>7} {old_s:>8.2f} {old_frames:>11} {old_bytes / 1024:>9.0f} "
+              f"{new_s:>8.2f} {new_frames:>11} {new_bytes / 1024:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
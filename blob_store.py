@@ -0,0 +1,43 @@
+import os
+import re
+import hashlib
+
+
+class BlobStore:
+    """
+    Content-addressed file store for uploaded media.
+
+    put() writes the bytes once under their SHA-256 and returns a short reference
+    ("<sha256>.<ext>"); chat messages keep only that reference and path() resolves it
+    when the message is displayed. Uploading the same file twice stores it once.
+    """
+
+    _REF_RE = re.compile(r"^[0-9a-f]{64}\.[a-z0-9]{1,5}$")
+
+    def __init__(self, root: str = "blobs"):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def put(self, data: bytes, ext: str = "bin") -> str:
+        ref = f"{hashlib.sha256(data).hexdigest()}.{ext.lower().lstrip('.')}"
+        path = self.path(ref)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        return ref
+
+    def path(self, ref: str) -> str:
+        if not self._REF_RE.match(ref):
+            raise ValueError(f"Not a blob reference: {ref!r}")
+        # Two-level fan-out keeps directories small
+        return os.path.join(self.root, ref[:2], ref)
+
+    def get(self, ref: str) -> bytes:
+        with open(self.path(ref), "rb") as f:
+            return f.read()
+
+    def exists(self, ref: str) -> bool:
+        return os.path.exists(self.path(ref))
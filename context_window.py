@@ -0,0 +1,155 @@
+# Context sizes (tokens) of the models offered in the apps; matched on the name before ":".
+MODEL_CONTEXT_TOKENS = {
+    "phi3": 4096,
+    "llama2": 4096,
+    "llama3": 8192,
+    "mistral": 8192,
+    "gemma": 8192,
+}
+DEFAULT_CONTEXT_TOKENS = 4096
+REPLY_RESERVE_TOKENS = 1024  # left free for the model's answer
+MESSAGE_OVERHEAD_TOKENS = 4  # role markers / separators added by the chat template
+SUMMARY_TOKENS = 256
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Roughly 4 characters per token for the BPE tokenizers these models use. O(1), model-agnostic,
+    and errs on the side of over-counting non-English text, which keeps us under the limit.
+    """
+    return (len(text) + 3) // 4
+
+
+def message_tokens(message: dict) -> int:
+    content = message.get("content", "")
+    if not isinstance(content, str):
+        content = str(content)
+    return MESSAGE_OVERHEAD_TOKENS + estimate_tokens(content)
+
+
+def context_budget(model: str = None, reserve: int = REPLY_RESERVE_TOKENS, overrides: dict = None) -> int:
+    """
+    Prompt token budget for `model`: its context size minus room for the reply.
+    """
+    base = (model or "").split(":")[0].lower()
+    sizes = dict(MODEL_CONTEXT_TOKENS, **(overrides or {}))
+    return max(256, sizes.get(base, DEFAULT_CONTEXT_TOKENS) - reserve)
+
+
+def truncate_to_tokens(text: str, tokens: int) -> str:
+    max_chars = max(0, tokens) * 4
+    if len(text) <= max_chars:
+        return text
+    return text[:max_chars] + " …[truncated]"
+
+
+def split_messages(messages: list, budget: int, keep_last: int = 1, reserved: int = 0):
+    """
+    Splits a conversation into (system, dropped, kept).
+
+    Leading system messages are always kept. Then the newest messages are taken, newest first,
+    until the budget (minus `reserved`) runs out; older ones go to `dropped`. The last `keep_last`
+    messages are always kept, truncated if a single one is larger than the budget.
+    """
+    n_system = 0
+    while n_system < len(messages) and messages[n_system].get("role") == "system":
+        n_system += 1
+    system, rest = list(messages[:n_system]), messages[n_system:]
+
+    remaining = budget - reserved - sum(message_tokens(m) for m in system)
+    kept = []
+    for i, m in enumerate(reversed(rest)):
+        cost = message_tokens(m)
+        if cost <= remaining:
+            kept.append(m)
+            remaining -= cost
+        elif i < keep_last:
+            trimmed = dict(m)
+            trimmed["content"] = truncate_to_tokens(str(m.get("content", "")), remaining - MESSAGE_OVERHEAD_TOKENS - 4)
+            kept.append(trimmed)
+            remaining = 0
+        else:
+            break
+    kept.reverse()
+    return system, rest[:len(rest) - len(kept)], kept
+
+
+def summary_message(summary: str) -> dict:
+    return {"role": "system", "content": f"Summary of the earlier conversation:\n{summary}"}
+
+
+def fit_messages(messages: list, model: str = None, budget: int = None, keep_last: int = 1) -> list:
+    """
+    Returns the system prompt plus the most recent messages that fit the model's token budget.
+    """
+    budget = budget or context_budget(model)
+    system, _, kept = split_messages(messages, budget, keep_last=keep_last)
+    return system + kept
+
+
+class ContextWindow:
+    """
+    Like fit_messages(), but dropped turns are folded into a rolling summary.
+
+    `summarize(messages, previous_summary) -> str` is only called once at least `summarize_every`
+    new messages have fallen out of the window, so most turns cost no extra request.
+    Keep one instance per conversation (e.g. in st.session_state).
+    """
+
+    def __init__(self, model: str = None, budget: int = None, summarize=None, summarize_every: int = 6,
+                 keep_last: int = 1):
+        self.model = model
+        self.budget = budget
+        self.summarize = summarize
+        self.summarize_every = summarize_every
+        self.keep_last = keep_last
+        self.summary = ""
+        self.summarized = 0  # how many of the dropped messages the summary covers
+
+    def build(self, messages: list) -> list:
+        budget = self.budget or context_budget(self.model)
+        reserved = SUMMARY_TOKENS + MESSAGE_OVERHEAD_TOKENS if self.summarize else 0
+        system, dropped, kept = split_messages(messages, budget, keep_last=self.keep_last, reserved=reserved)
+
+        if len(dropped) < self.summarized:  # conversation was cleared or replaced
+            self.summary, self.summarized = "", 0
+
+        if self.summarize and dropped and len(dropped) - self.summarized >= min(self.summarize_every, len(dropped)):
+            try:
+                summary = self.summarize(dropped[self.summarized:], self.summary)
+                self.summary = truncate_to_tokens(summary.strip(), SUMMARY_TOKENS)
+                self.summarized = len(dropped)
+            except Exception:
+                pass  # keep the previous summary; the turns are simply dropped
+
+        if dropped and self.summary:
+            return system + [summary_message(self.summary)] + kept
+        return system + kept
+
+
+def summary_update_prompt(messages: list, previous_summary: str = "") -> str:
+    transcript = "\n".join(f"{m.get('role', 'user')}: {m.get('content', '')}" for m in messages)
+    return (
+        "Update the running summary of a conversation with the new turns below. "
+        "Keep names, numbers and decisions; answer with the summary only, under 150 words.\n\n"
+        f"Current summary:\n{previous_summary or '(none)'}\n\nNew turns:\n{transcript}"
+    )
+
+
+def ollama_summarizer(base_url: str, model: str, timeout: float = 60):
+    """
+    Builds a `summarize` callable for ContextWindow that asks Ollama's /api/chat for a summary.
+    """
+    import requests
+
+    def summarize(messages, previous_summary):
+        prompt = summary_update_prompt(messages, previous_summary)
+        r = requests.post(
+            f"{base_url.rstrip('/')}/api/chat",
+            json={"model": model, "messages": [{"role": "user", "content": prompt}], "stream": False},
+            timeout=timeout,
+        )
+        r.raise_for_status()
+        return r.json()["message"]["content"]
+
+    return summarize
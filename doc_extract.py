@@ -0,0 +1,130 @@
+import os
+import tempfile
+from collections import Counter, deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from pdf_ocr import ocr_pdf_page
+
+# One extracted page. method is how its text was obtained:
+#   "text"       - the PDF's own text layer
+#   "ocr"        - rasterized and OCR'd because the text layer was empty/too short
+#   "ocr_failed" - OCR was needed but failed (e.g. poppler/tesseract missing); text layer kept
+#   "skipped"    - no usable text layer and OCR disabled
+PageResult = namedtuple("PageResult", ["number", "total", "text", "method"])
+
+# Pages with fewer letters/digits than this in their text layer are treated as scans
+MIN_TEXT_CHARS = 25
+
+
+def has_usable_text(text: str, min_chars: int = MIN_TEXT_CHARS) -> bool:
+    return sum(ch.isalnum() for ch in text) >= min_chars
+
+
+def _iter_text_layer(pdf_path: str):
+    """
+    Yields (page_number, total, text) from the PDF's text layer, one page at a time.
+    Uses pdfplumber when installed, otherwise PyPDF2.
+    """
+    try:
+        import pdfplumber
+    except ImportError:
+        from PyPDF2 import PdfReader
+        reader = PdfReader(pdf_path)
+        total = len(reader.pages)
+        for number, page in enumerate(reader.pages, start=1):
+            yield number, total, page.extract_text() or ""
+        return
+
+    with pdfplumber.open(pdf_path) as pdf:
+        total = len(pdf.pages)
+        for page in pdf.pages:
+            text = page.extract_text() or ""
+            page.flush_cache()  # release parsed objects; keeps memory flat on long PDFs
+            yield page.page_number, total, text
+
+
+def _ocr_or_fallback(pdf_path, number, layer_text, dpi, poppler_path, lang):
+    try:
+        ocr_text = ocr_pdf_page(pdf_path, number, dpi=dpi, poppler_path=poppler_path, lang=lang)
+    except Exception:
+        return layer_text, "ocr_failed"
+    if len(ocr_text.strip()) >= len(layer_text.strip()):
+        return ocr_text, "ocr"
+    return layer_text, "text"
+
+
+def iter_pdf_pages(pdf, ocr: bool = True, min_chars: int = MIN_TEXT_CHARS, poppler_path=None,
+                   dpi: int = 200, workers: int = 0, lang: str = "eng"):
+    """
+    Hybrid PDF extraction: yields a PageResult per page, in page order.
+
+    Each page's text layer is read first; only pages without usable text are rasterized
+    and OCR'd, in parallel on `workers` threads. `pdf` is a file path, raw bytes or a
+    binary file object.
+    """
+    workers = workers or os.cpu_count() or 1
+    tmp_path = None
+    if not isinstance(pdf, (str, os.PathLike)):
+        data = pdf if isinstance(pdf, (bytes, bytearray)) else pdf.read()
+        # poppler needs a real file for per-page rasterizing; spool once
+        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
+            tmp.write(data)
+            tmp_path = pdf = tmp.name
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            pending = deque()  # (number, total, text or future, method)
+            try:
+                for number, total, text in _iter_text_layer(pdf):
+                    if has_usable_text(text, min_chars):
+                        pending.append((number, total, text, "text"))
+                    elif ocr:
+                        future = pool.submit(_ocr_or_fallback, pdf, number, text, dpi, poppler_path, lang)
+                        pending.append((number, total, future, None))
+                    else:
+                        pending.append((number, total, text, "skipped"))
+
+                    # Emit whatever is ready at the head; block only when too far ahead
+                    while pending and (len(pending) >= 2 * workers or pending[0][3] or pending[0][2].done()):
+                        yield _resolve(pending.popleft())
+
+                while pending:
+                    yield _resolve(pending.popleft())
+            finally:
+                for item in pending:
+                    if item[3] is None:
+                        item[2].cancel()
+    finally:
+        if tmp_path:
+            os.remove(tmp_path)
+
+
+def _resolve(item) -> PageResult:
+    number, total, text, method = item
+    if method is None:
+        text, method = text.result()
+    return PageResult(number, total, text, method)
+
+
+def extract_pdf_text(pdf, progress=None, on_page=None, **kwargs):
+    """
+    Convenience wrapper: returns (full_text, {method: page_count}).
+    `progress(pages_done, pages_total)` and `on_page(PageResult)` are called after each page, if given.
+    """
+    texts, methods = [], Counter()
+    for page in iter_pdf_pages(pdf, **kwargs):
+        texts.append(page.text.strip())
+        methods[page.method] += 1
+        if on_page:
+            on_page(page)
+        if progress:
+            progress(page.number, page.total)
+    return "\n".join(t for t in texts if t).strip(), dict(methods)
+
+
+def describe_methods(methods: dict) -> str:
+    """
+    e.g. {"text": 12, "ocr": 3} -> "12 page(s) from text layer, 3 page(s) via OCR"
+    """
+    labels = {"text": "from text layer", "ocr": "via OCR", "ocr_failed": "OCR failed", "skipped": "no text"}
+    return ", ".join(f"{count} page(s) {labels.get(method, method)}" for method, count in methods.items())
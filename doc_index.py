@@ -0,0 +1,191 @@
+import os
+import re
+import json
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+
+EMBED_MODEL = "nomic-embed-text"
+CHUNK_CHARS = 1200
+CHUNK_OVERLAP = 200
+EMBED_BATCH = 32
+
+
+def document_id(data) -> str:
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+def _cut(text: str, start: int, chunk_chars: int) -> int:
+    # End of the chunk starting at `start`: the last paragraph/sentence/word break past its middle
+    end = start + chunk_chars
+    window = text[start:end]
+    for sep in ("\n\n", "\n", ". ", " "):
+        cut = window.rfind(sep)
+        if cut > chunk_chars // 2:
+            return start + cut + len(sep)
+    return end
+
+
+def iter_chunks(pieces, chunk_chars: int = CHUNK_CHARS, overlap: int = CHUNK_OVERLAP):
+    """
+    Streaming chunk_text(): `pieces` is an iterable of texts (e.g. PDF pages, joined with
+    newlines) and each chunk is yielded as soon as the text after it has arrived, so
+    embedding can start on the first pages while later ones are still being parsed.
+    Yields exactly what chunk_text() returns for the joined text.
+    """
+    buffer, start = "", 0
+    for piece in pieces:
+        piece = re.sub(r"[ \t]+", " ", piece).strip()
+        if not piece:
+            continue
+        buffer = f"{buffer}\n{piece}" if buffer else piece
+        # A chunk is final once there is text beyond its window
+        while len(buffer) - start > chunk_chars:
+            end = _cut(buffer, start, chunk_chars)
+            chunk = buffer[start:end].strip()
+            if chunk:
+                yield chunk
+            start = max(end - overlap, start + 1)
+        buffer, start = buffer[start:], 0
+
+    while start < len(buffer):
+        end = min(len(buffer), start + chunk_chars)
+        if end < len(buffer):
+            end = _cut(buffer, start, chunk_chars)
+        chunk = buffer[start:end].strip()
+        if chunk:
+            yield chunk
+        if end >= len(buffer):
+            break
+        start = max(end - overlap, start + 1)
+
+
+def chunk_text(text: str, chunk_chars: int = CHUNK_CHARS, overlap: int = CHUNK_OVERLAP) -> list:
+    """
+    Splits text into ~chunk_chars pieces that overlap by ~overlap chars, breaking on
+    paragraph/sentence/word boundaries where possible so chunks stay readable.
+    """
+    return list(iter_chunks([text], chunk_chars, overlap))
+
+
+def ollama_embed(texts: list, model: str = EMBED_MODEL, base_url: str = "http://localhost:11434",
+                 batch_size: int = 32, timeout: float = 120, keep_alive=None) -> np.ndarray:
+    """
+    Embeds texts with Ollama. Uses the batched /api/embed endpoint, falling back to the older
+    one-text-per-call /api/embeddings on servers that don't have it. `keep_alive` (a duration
+    string or seconds) is sent along when given, so the model stays loaded between calls.
+    """
+    base_url = base_url.rstrip("/")
+    extra = {} if keep_alive is None else {"keep_alive": keep_alive}
+    vectors = []
+    for i in range(0, len(texts), batch_size):
+        batch = texts[i:i + batch_size]
+        r = requests.post(f"{base_url}/api/embed", json={"model": model, "input": batch, **extra}, timeout=timeout)
+        if r.status_code == 404:
+            for text in batch:
+                r = requests.post(f"{base_url}/api/embeddings", json={"model": model, "prompt": text, **extra},
+                                  timeout=timeout)
+                r.raise_for_status()
+                vectors.append(r.json()["embedding"])
+            continue
+        r.raise_for_status()
+        vectors.extend(r.json()["embeddings"])
+    return np.asarray(vectors, dtype=np.float32)
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+class DocIndex:
+    """
+    On-disk vector index of document chunks, one folder per document:
+
+        <root>/<doc_id>/chunks.json   chunk texts + metadata
+        <root>/<doc_id>/vectors.npy   unit-length float32 embeddings, one row per chunk
+
+    A document is chunked and embedded once; later questions only embed the query and do a
+    brute-force cosine search over the memory-mapped vectors.
+    """
+
+    def __init__(self, root: str = "doc_index", embed_model: str = EMBED_MODEL,
+                 base_url: str = "http://localhost:11434", keep_alive=None):
+        self.root = root
+        self.embed_model = embed_model
+        self.base_url = base_url
+        self.keep_alive = keep_alive
+
+    def _embed(self, texts: list) -> np.ndarray:
+        return ollama_embed(texts, self.embed_model, self.base_url, keep_alive=self.keep_alive)
+
+    def _dir(self, doc_id: str) -> str:
+        # Vectors from different embedding models aren't comparable
+        model_tag = re.sub(r"[^A-Za-z0-9_.-]", "_", self.embed_model)
+        return os.path.join(self.root, model_tag, doc_id)
+
+    def has(self, doc_id: str) -> bool:
+        return os.path.exists(os.path.join(self._dir(doc_id), "vectors.npy"))
+
+    def ingest(self, doc_id: str, text, name: str = "") -> int:
+        """
+        Chunks and embeds `text` unless this document is already indexed. Returns the chunk count.
+
+        `text` may also be an iterable of pieces (e.g. a generator of PDF pages): chunks are
+        then cut as the pieces arrive and embedded EMBED_BATCH at a time on a background
+        thread, so Ollama works on the first pages while later ones are still being parsed.
+        """
+        folder = self._dir(doc_id)
+        if self.has(doc_id):
+            with open(os.path.join(folder, "chunks.json"), "r", encoding="utf-8") as f:
+                return len(json.load(f)["chunks"])
+
+        chunks, batch, pending = [], [], []
+        with ThreadPoolExecutor(max_workers=1) as embedder:
+            for chunk in iter_chunks([text] if isinstance(text, str) else text):
+                chunks.append(chunk)
+                batch.append(chunk)
+                if len(batch) == EMBED_BATCH:
+                    pending.append(embedder.submit(self._embed, batch))
+                    batch = []
+            if batch:
+                pending.append(embedder.submit(self._embed, batch))
+            if not chunks:
+                return 0
+            vectors = _normalize(np.concatenate([future.result() for future in pending]))
+
+        os.makedirs(folder, exist_ok=True)
+        with open(os.path.join(folder, "chunks.json"), "w", encoding="utf-8") as f:
+            json.dump({"name": name, "embed_model": self.embed_model, "chunks": chunks}, f, ensure_ascii=False)
+        # Written last and renamed into place, so has() never sees a half-built index
+        tmp_path = os.path.join(folder, "vectors.tmp.npy")
+        np.save(tmp_path, vectors)
+        os.replace(tmp_path, os.path.join(folder, "vectors.npy"))
+        return len(chunks)
+
+    def search(self, doc_id: str, query: str, k: int = 4) -> list:
+        """
+        Returns up to k (score, chunk) pairs, best first.
+        """
+        folder = self._dir(doc_id)
+        with open(os.path.join(folder, "chunks.json"), "r", encoding="utf-8") as f:
+            chunks = json.load(f)["chunks"]
+        vectors = np.load(os.path.join(folder, "vectors.npy"), mmap_mode="r")
+
+        query_vec = _normalize(self._embed([query]))[0]
+        scores = vectors @ query_vec
+        k = min(k, len(chunks))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(float(scores[i]), chunks[i]) for i in top]
+
+    def head(self, doc_id: str, k: int = 4) -> list:
+        """
+        First k chunks, for requests with no question (e.g. "summarize this file").
+        """
+        with open(os.path.join(self._dir(doc_id), "chunks.json"), "r", encoding="utf-8") as f:
+            return json.load(f)["chunks"][:k]
@@ -0,0 +1,143 @@
+import os
+import json
+import time
+import threading
+
+
+class HistoryStore:
+    """
+    Append-only chat history kept as JSON Lines: one {"user", "bot", "ts"} object per turn.
+
+    Appending a turn writes one line, so the cost no longer grows with the history size, and a
+    crash mid-write can at worst leave a torn last line. Lines are checked as they're indexed
+    and torn ones skipped, so counts and pages only cover valid turns; only the byte offset of
+    each valid line is kept, and a page of turns is parsed again on demand.
+    """
+
+    def __init__(self, path: str, legacy_path: str = None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._offsets = []  # byte offset where each complete, valid line starts
+        self._indexed_size = 0
+        if legacy_path and os.path.exists(legacy_path) and not os.path.exists(path):
+            self._migrate(legacy_path)
+        self._refresh()
+
+    # -------------------- Reading --------------------
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh()
+            return len(self._offsets)
+
+    def turns(self, start: int = 0, stop: int = None) -> list:
+        """
+        Returns turns[start:stop] (oldest first) as {"user", "bot", "ts"} dicts.
+        """
+        with self._lock:
+            self._refresh()
+            offsets = self._offsets[start:stop]
+            if not offsets:
+                return []
+            result = []
+            with open(self.path, "rb") as f:
+                for offset in offsets:
+                    # Seek per turn: skipped torn lines may sit between indexed ones
+                    f.seek(offset)
+                    entry = self._parse(f.readline())
+                    if entry is not None:
+                        result.append(entry)
+            return result
+
+    def recent(self, n: int) -> list:
+        return self.turns(max(0, len(self) - n))
+
+    def page(self, page: int, page_size: int = 20) -> list:
+        """
+        Page 0 is the newest `page_size` turns. Returns (index, turn) pairs, newest first.
+        """
+        total = len(self)
+        stop = max(0, total - page * page_size)
+        start = max(0, stop - page_size)
+        return list(reversed(list(enumerate(self.turns(start, stop), start=start))))
+
+    # -------------------- Writing --------------------
+    def append(self, user: str, bot: str):
+        line = json.dumps({"user": user, "bot": bot, "ts": time.time()}, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._refresh()
+            if os.path.exists(self.path) and os.path.getsize(self.path) > self._indexed_size:
+                line = "\n" + line  # terminate a torn line left by a crash so it can't swallow this one
+            with open(self.path, "ab") as f:
+                f.write(line.encode("utf-8"))
+                f.flush()
+                os.fsync(f.fileno())
+
+    def clear(self):
+        with self._lock:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            self._offsets = []
+            self._indexed_size = 0
+
+    # -------------------- Internals --------------------
+    @staticmethod
+    def _parse(raw: bytes):
+        try:
+            entry = json.loads(raw)
+        except ValueError:
+            return None  # torn write from a crash
+        return entry if isinstance(entry, dict) else None
+
+    def _refresh(self):
+        """
+        Indexes lines appended since the last call (by this or another process).
+        """
+        if not os.path.exists(self.path):
+            self._offsets, self._indexed_size = [], 0
+            return
+        size = os.path.getsize(self.path)
+        if size < self._indexed_size:  # file was replaced/truncated
+            self._offsets, self._indexed_size = [], 0
+        if size == self._indexed_size:
+            return
+        with open(self.path, "rb") as f:
+            f.seek(self._indexed_size)
+            pos = self._indexed_size
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break  # incomplete last line; pick it up once it is finished
+                if self._parse(raw) is not None:  # a torn line terminated by a later append stays out
+                    self._offsets.append(pos)
+                pos += len(raw)
+            self._indexed_size = pos
+
+    def _migrate(self, legacy_path: str):
+        """
+        One-time conversion of the old chat_history.json (a JSON list) to JSON Lines.
+        """
+        try:
+            with open(legacy_path, "r", encoding="utf-8") as f:
+                saved = json.load(f)
+        except (ValueError, OSError):
+            saved = []
+
+        turns, pending_user = [], None
+        for item in saved if isinstance(saved, list) else []:
+            if not isinstance(item, dict):
+                continue
+            if "user" in item and "bot" in item:
+                turns.append((item["user"], item["bot"]))
+            elif item.get("role") == "user":
+                pending_user = item.get("content", "")
+            elif item.get("role") == "assistant" and pending_user is not None:
+                turns.append((pending_user, item.get("content", "")))
+                pending_user = None
+
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for user, bot in turns:
+                f.write(json.dumps({"user": user, "bot": bot, "ts": None}, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        os.replace(legacy_path, legacy_path + ".bak")
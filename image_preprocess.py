@@ -0,0 +1,183 @@
+import os
+
+from PIL import Image, ImageOps
+
+# Available steps, in the order they're usually applied
+STEPS = ("orient", "downscale", "grayscale", "binarize", "deskew", "crop")
+
+# Steps applied before every OCR call unless an engine is given its own Preprocessor,
+# e.g. OCR_PREPROCESS=orient,downscale,grayscale,deskew ("" disables preprocessing)
+DEFAULT_STEPS = tuple(s.strip() for s in os.getenv("OCR_PREPROCESS", "orient,downscale,grayscale").split(",")
+                      if s.strip())
+
+# numpy is imported inside the steps that need it: the default steps are plain Pillow, so
+# a tesseract-only setup never loads it
+
+
+def _gray_array(image) -> "np.ndarray":
+    import numpy as np
+    return np.asarray(image if image.mode == "L" else image.convert("L"))
+
+
+def otsu_threshold(gray: "np.ndarray") -> int:
+    """
+    Global threshold that best separates dark (ink) and light (paper) pixels.
+    """
+    import numpy as np
+    hist = np.bincount(gray.ravel(), minlength=256).astype(np.float64)
+    levels = np.arange(256)
+    weight_dark = np.cumsum(hist)
+    weight_light = weight_dark[-1] - weight_dark
+    sum_dark = np.cumsum(hist * levels)
+    mean_dark = sum_dark / np.maximum(weight_dark, 1)
+    mean_light = (sum_dark[-1] - sum_dark) / np.maximum(weight_light, 1)
+    between = weight_dark * weight_light * (mean_dark - mean_light) ** 2
+    return int(np.argmax(between))
+
+
+def ink_mask(gray: "np.ndarray") -> "np.ndarray":
+    return gray <= otsu_threshold(gray)
+
+
+# -------------------- Steps --------------------
+def orient(image):
+    """
+    Applies the EXIF rotation phone cameras record instead of rotating the pixels.
+    """
+    return ImageOps.exif_transpose(image)
+
+
+def downscale(image, max_side: int = 2000, target_dpi: int = 300):
+    """
+    Shrinks images scanned above `target_dpi` (when the file records its DPI) and caps the
+    long side at `max_side` pixels (0 = no cap). Never upscales.
+    """
+    scale = 1.0
+    dpi = image.info.get("dpi")
+    if dpi and dpi[0] and dpi[0] > target_dpi:
+        scale = target_dpi / float(dpi[0])
+    long_side = max(image.size)
+    if max_side and long_side * scale > max_side:
+        scale = max_side / long_side
+    if scale >= 1.0:
+        return image
+    size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+    # reducing_gap downsamples in integer steps first; much faster on big photos, same quality
+    return image.resize(size, Image.LANCZOS, reducing_gap=3.0)
+
+
+def grayscale(image):
+    return image if image.mode == "L" else image.convert("L")
+
+
+def binarize(image, block: int = 31, offset: float = 0.15):
+    """
+    Adaptive (local mean) threshold: a pixel is ink if it's more than `offset` darker than
+    the mean of the block x block window around it. Handles shadows and uneven lighting
+    that a single global threshold can't. Window sums come from an integral image, so the
+    cost is O(pixels) whatever the block size.
+    """
+    import numpy as np
+    gray = _gray_array(image).astype(np.float64)
+    h, w = gray.shape
+    r = block // 2
+    integral = np.zeros((h + 1, w + 1))
+    integral[1:, 1:] = gray.cumsum(0).cumsum(1)
+
+    y0, y1 = np.clip(np.arange(h) - r, 0, h), np.clip(np.arange(h) + r + 1, 0, h)
+    x0, x1 = np.clip(np.arange(w) - r, 0, w), np.clip(np.arange(w) + r + 1, 0, w)
+    sums = (integral[y1][:, x1] - integral[y0][:, x1] - integral[y1][:, x0] + integral[y0][:, x0])
+    counts = np.outer(y1 - y0, x1 - x0)
+
+    out = np.where(gray * counts < sums * (1.0 - offset), 0, 255).astype(np.uint8)
+    return Image.fromarray(out, mode="L")
+
+
+def estimate_skew(image, max_angle: float = 5.0, step: float = 0.25, work_side: int = 800) -> float:
+    """
+    Text-line angle in degrees (counter-clockwise positive), by projection profile: the
+    angle at which ink pixels pile into the fewest, fullest rows. All candidate angles are
+    scored at once on a small copy of the image.
+    """
+    import numpy as np
+    small = grayscale(image)
+    if max(small.size) > work_side:
+        small = small.copy()
+        small.thumbnail((work_side, work_side))
+    ys, xs = np.nonzero(ink_mask(np.asarray(small)))
+    if len(ys) < 50:
+        return 0.0
+
+    angles = np.deg2rad(np.arange(-max_angle, max_angle + step / 2, step))
+    # Row each ink pixel lands in once the page is rotated by -angle, for every angle at once
+    rows = np.rint(ys[None, :] * np.cos(angles)[:, None] + xs[None, :] * np.sin(angles)[:, None]).astype(np.int64)
+    rows -= rows.min()
+    n_rows = int(rows.max()) + 1
+    counts = np.bincount((rows + n_rows * np.arange(len(angles))[:, None]).ravel(),
+                         minlength=n_rows * len(angles)).reshape(len(angles), n_rows)
+    scores = (counts.astype(np.float64) ** 2).sum(axis=1)
+    return float(np.rad2deg(angles[int(np.argmax(scores))]))
+
+
+def deskew(image, max_angle: float = 5.0, min_angle: float = 0.25):
+    angle = estimate_skew(image, max_angle=max_angle)
+    if abs(angle) < min_angle:
+        return image
+    fill = 255 if image.mode == "L" else (255,) * len(image.getbands())
+    return image.rotate(-angle, resample=Image.BICUBIC, expand=True, fillcolor=fill)
+
+
+def crop_to_text(image, margin: int = 16, min_ink: float = 0.002):
+    """
+    Crops to the bounding box of rows/columns holding more than `min_ink` ink, plus a margin;
+    borders, table edges and empty paper stop costing OCR time.
+    """
+    import numpy as np
+    ink = ink_mask(_gray_array(image))
+    rows = np.flatnonzero(ink.mean(axis=1) > min_ink)
+    cols = np.flatnonzero(ink.mean(axis=0) > min_ink)
+    if len(rows) == 0 or len(cols) == 0:
+        return image
+    box = (
+        max(0, cols[0] - margin), max(0, rows[0] - margin),
+        min(image.width, cols[-1] + 1 + margin), min(image.height, rows[-1] + 1 + margin),
+    )
+    return image.crop(box)
+
+
+class Preprocessor:
+    """
+    Configurable image pipeline run in front of OCR. `steps` is any subset of STEPS, applied
+    in the given order; Preprocessor(steps=()) passes images through untouched.
+    """
+
+    def __init__(self, steps=DEFAULT_STEPS, max_side: int = 2000, target_dpi: int = 300,
+                 block: int = 31, offset: float = 0.15, max_skew: float = 5.0):
+        unknown = [s for s in steps if s not in STEPS]
+        if unknown:
+            raise ValueError(f"Unknown preprocessing step {unknown[0]!r}; choose from {STEPS}")
+        self.steps = tuple(steps)
+        self.max_side = max_side
+        self.target_dpi = target_dpi
+        self.block = block
+        self.offset = offset
+        self.max_skew = max_skew
+
+    def __call__(self, image):
+        for step in self.steps:
+            if step == "orient":
+                image = orient(image)
+            elif step == "downscale":
+                image = downscale(image, self.max_side, self.target_dpi)
+            elif step == "grayscale":
+                image = grayscale(image)
+            elif step == "binarize":
+                image = binarize(image, self.block, self.offset)
+            elif step == "deskew":
+                image = deskew(image, self.max_skew)
+            elif step == "crop":
+                image = crop_to_text(image)
+        return image
+
+    def __repr__(self):
+        return f"Preprocessor(steps={self.steps!r})"
@@ -0,0 +1,182 @@
+import os
+import time
+import threading
+
+import requests
+
+# get_manager()'s settings for the Streamlit apps
+MODEL_MEMORY_MB = int(os.getenv("MODEL_MEMORY_MB", "0"))  # > 0: unload the least recently used models to stay under this
+MODEL_KEEP_ALIVE = os.getenv("MODEL_KEEP_ALIVE", "30m")  # how long a model stays loaded after its last use
+
+
+def canonical(model: str) -> str:
+    """
+    The name Ollama reports for `model`: "phi3" is listed as "phi3:latest".
+    """
+    return model if ":" in model else model + ":latest"
+
+
+def keep_alive_value(value: str):
+    """
+    `value` as Ollama's keep_alive takes it: a duration string ("30m") or a number of seconds
+    (-1 = until unloaded). Settings are strings, so "-1" becomes -1.
+    """
+    return int(value) if value.lstrip("-").isdigit() else value
+
+
+class ModelManager:
+    """
+    Keeps the models a front end offers warm in one Ollama server.
+
+    preload() loads them in the background at startup. use(model) records that a model is
+    about to be used and returns the keep_alive to send with the request, so models in use stay
+    pinned. With `budget_mb`, the least recently used resident models are unloaded before a
+    model that wouldn't fit is loaded, instead of leaving Ollama to evict whatever it likes.
+
+    Residency comes from /api/ps, cached for `ttl` seconds like OllamaProbe's status, so
+    labelling a selector on every rerun doesn't cost a request each time.
+
+    `embedding_models` are loaded through /api/embed: Ollama refuses /api/generate, even an
+    empty one, for a model that can only embed.
+    """
+
+    def __init__(self, base_url: str = "http://localhost:11434", budget_mb: int = 0, keep_alive: str = "30m",
+                 ttl: float = 5, timeout: float = 2, load_timeout: float = 300, embedding_models=()):
+        self.base_url = base_url.rstrip("/")
+        self.embedding_models = {canonical(model) for model in embedding_models}
+        self.budget_bytes = budget_mb * 1024 * 1024
+        self.keep_alive = keep_alive_value(keep_alive)
+        self.ttl = ttl
+        self.timeout = timeout
+        self.load_timeout = load_timeout
+        self._lock = threading.Lock()
+        self._evict_lock = threading.Lock()
+        self._last_used = {}  # canonical name -> time.monotonic() of its last use
+        self._sizes = None  # canonical name -> size on disk, from /api/tags
+        self._resident = None
+        self._expires_at = 0.0
+
+    def resident(self, force: bool = False) -> dict:
+        """
+        {name: bytes in memory} for the models Ollama has loaded ({} if it can't be reached).
+        """
+        with self._lock:
+            if force or self._resident is None or time.monotonic() >= self._expires_at:
+                try:
+                    r = requests.get(f"{self.base_url}/api/ps", timeout=self.timeout)
+                    r.raise_for_status()
+                    self._resident = {m["name"]: m.get("size", 0) for m in r.json().get("models", [])}
+                except Exception:
+                    self._resident = {}
+                self._expires_at = time.monotonic() + self.ttl
+            return self._resident
+
+    def is_warm(self, model: str) -> bool:
+        return canonical(model) in self.resident()
+
+    def label(self, model: str) -> str:
+        """
+        `model` with its state, for a selectbox's format_func.
+        """
+        return f"{model} · {'🔥 warm' if self.is_warm(model) else '❄️ cold'}"
+
+    def preload(self, models: list, background: bool = True):
+        """
+        Loads `models` in order, stopping at the first one that wouldn't fit the budget
+        (preloading never evicts). Models that aren't pulled are skipped.
+        """
+        def run():
+            for model in models:
+                if self.budget_bytes:
+                    used = sum(self.resident(force=True).values())
+                    if used + self._size(model) > self.budget_bytes:
+                        break
+                try:
+                    self.load(model)
+                except requests.RequestException:
+                    continue
+
+        if background:
+            threading.Thread(target=run, name="model-preload", daemon=True).start()
+        else:
+            run()
+
+    def use(self, model: str):
+        """
+        Marks `model` as the most recently used, makes room for it under the budget, and
+        returns the keep_alive to send with its request.
+        """
+        with self._lock:
+            self._last_used[canonical(model)] = time.monotonic()
+        if self.budget_bytes:
+            self._make_room(model)
+        return self.keep_alive
+
+    def load(self, model: str):
+        # A generate request without a prompt (an embed request without input) only loads the model
+        if canonical(model) in self.embedding_models:
+            url, payload = f"{self.base_url}/api/embed", {"model": model, "input": "", "keep_alive": self.keep_alive}
+        else:
+            url, payload = f"{self.base_url}/api/generate", {"model": model, "keep_alive": self.keep_alive}
+        r = requests.post(url, json=payload, timeout=self.load_timeout)
+        r.raise_for_status()
+        self._invalidate()
+
+    def unload(self, model: str):
+        r = requests.post(f"{self.base_url}/api/generate", json={"model": model, "keep_alive": 0}, timeout=self.timeout)
+        r.raise_for_status()
+        self._invalidate()
+
+    def _invalidate(self):
+        with self._lock:
+            self._expires_at = 0.0
+
+    def _size(self, model: str) -> int:
+        # Size on disk is close enough to what a model takes once loaded; 0 if unknown
+        if self._sizes is None:
+            try:
+                r = requests.get(f"{self.base_url}/api/tags", timeout=self.timeout)
+                r.raise_for_status()
+                self._sizes = {m["name"]: m.get("size", 0) for m in r.json().get("models", [])}
+            except Exception:
+                return 0
+        return self._sizes.get(canonical(model), 0)
+
+    def _make_room(self, model: str):
+        with self._evict_lock:
+            resident = self.resident(force=True)
+            name = canonical(model)
+            if name in resident:
+                return
+            used = sum(resident.values())
+            needed = self._size(model)
+            # Coldest first; models loaded by someone else have no recorded use and go before any of ours
+            with self._lock:
+                coldest = sorted(resident, key=lambda n: self._last_used.get(n, 0.0))
+            for other in coldest:
+                if used + needed <= self.budget_bytes:
+                    break
+                try:
+                    self.unload(other)
+                except requests.RequestException:
+                    continue
+                used -= resident[other]
+
+
+_managers = {}
+_managers_lock = threading.Lock()
+
+
+def get_manager(base_url: str = "http://localhost:11434", preload=(), embedding_models=()) -> ModelManager:
+    """
+    The process-wide manager for the Ollama server at `base_url`, shared by every caller (e.g. all
+    sessions of a Streamlit app). When it's created, `preload` starts loading in the background.
+    """
+    with _managers_lock:
+        manager = _managers.get(base_url)
+        if manager is None:
+            manager = _managers[base_url] = ModelManager(
+                base_url, budget_mb=MODEL_MEMORY_MB, keep_alive=MODEL_KEEP_ALIVE, embedding_models=embedding_models,
+            )
+            manager.preload(list(preload))
+        return manager
@@ -0,0 +1,303 @@
+import os
+import time
+import threading
+from collections import Counter, deque, namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import pytesseract
+
+from image_preprocess import Preprocessor
+
+# Default Windows install location; elsewhere tesseract is expected on PATH
+WINDOWS_TESSERACT_CMD = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
+TESSERACT_CMD = os.getenv("TESSERACT_CMD") or (WINDOWS_TESSERACT_CMD if os.name == "nt" else None)
+
+POLICIES = ("fallback", "fastest", "race")
+
+# get_router()'s defaults: "tesseract", "easyocr" or "both", and one of POLICIES
+OCR_ENGINE = os.getenv("OCR_ENGINE", "tesseract")
+OCR_POLICY = os.getenv("OCR_POLICY", "fallback")
+
+# One OCR attempt: recognized text, confidence in [0, 1], engine name, wall-clock seconds
+OcrResult = namedtuple("OcrResult", ["text", "confidence", "engine", "seconds"])
+
+
+class EngineStats:
+    """
+    Per-engine call count, errors, latency and mean confidence over the last `history` calls.
+    """
+
+    def __init__(self, history: int = 200):
+        self._lock = threading.Lock()
+        self._recent = deque(maxlen=history)  # (seconds, confidence) of successful calls
+        self._attempts = deque(maxlen=history)  # (seconds, succeeded) of all calls
+        self.calls = 0
+        self.errors = 0
+
+    def record(self, seconds: float, confidence: float = None):
+        with self._lock:
+            self.calls += 1
+            self._attempts.append((seconds, confidence is not None))
+            if confidence is None:
+                self.errors += 1
+            else:
+                self._recent.append((seconds, confidence))
+
+    def mean_seconds(self):
+        with self._lock:
+            return sum(s for s, _ in self._recent) / len(self._recent) if self._recent else None
+
+    def expected_seconds(self):
+        """
+        Seconds spent per successful result over recent calls, failures included (mean attempt
+        time / success rate). None before the first call; inf if no recent call succeeded.
+        """
+        with self._lock:
+            if not self._attempts:
+                return None
+            successes = sum(ok for _, ok in self._attempts)
+            if not successes:
+                return float("inf")
+            return sum(s for s, _ in self._attempts) / successes
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            times = sorted(s for s, _ in self._recent)
+            confidences = [c for _, c in self._recent]
+            return {
+                "calls": self.calls,
+                "errors": self.errors,
+                "avg_s": round(sum(times) / len(times), 4) if times else 0.0,
+                "p95_s": round(times[int(0.95 * (len(times) - 1))], 4) if times else 0.0,
+                "avg_confidence": round(sum(confidences) / len(confidences), 4) if confidences else 0.0,
+            }
+
+
+# -------------------- Engines --------------------
+class OcrEngine:
+    """
+    Common interface: recognize(PIL image) -> OcrResult. Subclasses implement _recognize()
+    returning (text, confidence); preprocessing, timing and stats are handled here.
+    `preprocess` defaults to Preprocessor() (the OCR_PREPROCESS steps); the reported
+    seconds include it, so the stats reflect the full cost of an engine.
+    """
+
+    name = "engine"
+
+    def __init__(self, preprocess=None):
+        self.stats = EngineStats()
+        self.preprocess = preprocess if preprocess is not None else Preprocessor()
+
+    def recognize(self, image) -> OcrResult:
+        start = time.perf_counter()
+        try:
+            text, confidence = self._recognize(self.preprocess(image))
+        except Exception:
+            self.stats.record(time.perf_counter() - start)
+            raise
+        seconds = time.perf_counter() - start
+        self.stats.record(seconds, confidence)
+        return OcrResult(text, confidence, self.name, seconds)
+
+    def warm(self):
+        """
+        Loads whatever the engine needs up front (models, binaries), so the first call isn't slow.
+        """
+
+    def _recognize(self, image):
+        raise NotImplementedError
+
+
+class TesseractEngine(OcrEngine):
+    """
+    pytesseract; confidence is the mean of tesseract's per-word confidences.
+    """
+
+    name = "tesseract"
+
+    def __init__(self, lang: str = "eng", cmd: str = TESSERACT_CMD, preprocess=None):
+        super().__init__(preprocess)
+        self.lang = lang
+        if cmd:
+            pytesseract.pytesseract.tesseract_cmd = cmd
+
+    def _recognize(self, image):
+        data = pytesseract.image_to_data(image, lang=self.lang, output_type=pytesseract.Output.DICT)
+        lines, words, confidences, current = [], [], [], None
+        for i, word in enumerate(data["text"]):
+            conf = float(data["conf"][i])
+            if conf < 0 or not word.strip():  # layout rows (page/block/line) carry conf -1
+                continue
+            line = (data["block_num"][i], data["par_num"][i], data["line_num"][i])
+            if line != current and words:
+                lines.append(" ".join(words))
+                words = []
+            current = line
+            words.append(word)
+            confidences.append(conf / 100)
+        if words:
+            lines.append(" ".join(words))
+        confidence = sum(confidences) / len(confidences) if confidences else 0.0
+        return "\n".join(lines).strip(), confidence
+
+
+class EasyOcrEngine(OcrEngine):
+    """
+    EasyOCR, imported and loaded on first use (torch + model weights take seconds).
+    Confidence is the per-box confidence weighted by each box's text length.
+    """
+
+    name = "easyocr"
+
+    def __init__(self, languages=("en",), gpu: bool = False, preprocess=None):
+        super().__init__(preprocess)
+        self.languages = list(languages)
+        self.gpu = gpu
+        self._reader = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._reader is not None
+
+    def warm(self):
+        with self._lock:
+            if self._reader is None:
+                import easyocr
+                self._reader = easyocr.Reader(self.languages, gpu=self.gpu)
+        return self._reader
+
+    def _recognize(self, image):
+        import numpy as np
+        results = self.warm().readtext(np.asarray(image if image.mode == "L" else image.convert("RGB")))
+        text = " ".join(r[1] for r in results).strip()
+        total_chars = sum(len(r[1]) for r in results)
+        confidence = sum(len(r[1]) * float(r[2]) for r in results) / total_chars if total_chars else 0.0
+        return text, confidence
+
+
+ENGINES = {
+    "tesseract": TesseractEngine,
+    "easyocr": EasyOcrEngine,
+}
+
+
+# -------------------- Router --------------------
+class OcrRouter:
+    """
+    Runs one or more engines on an image according to a policy:
+
+    - "fallback": engines in the given order; stop at the first result with at least
+      `min_chars` characters and `min_confidence`, else return the best one seen.
+    - "fastest":  like fallback, but cheapest engine first by measured latency per successful
+      result, so failures count against an engine (engines with no measurements yet go first
+      so they get measured).
+    - "race":     all engines at once; after `deadline` seconds take the best finished
+      result (waiting for the first one if none has finished). Slower engines keep running
+      in the background and still feed their stats.
+
+    "Best" means highest confidence among results with enough text. stats() reports each
+    engine's latency/confidence and how often it was the one chosen, for picking the
+    cheapest engine that meets quality.
+    """
+
+    def __init__(self, engines: list, policy: str = "fallback", min_confidence: float = 0.6,
+                 min_chars: int = 10, deadline: float = 5.0):
+        if policy not in POLICIES:
+            raise ValueError(f"policy must be one of {POLICIES}, got {policy!r}")
+        self.engines = list(engines)
+        self.policy = policy
+        self.min_confidence = min_confidence
+        self.min_chars = min_chars
+        self.deadline = deadline
+        self._chosen = Counter()
+        self._lock = threading.Lock()
+        self._race_pool = ThreadPoolExecutor(max_workers=2 * len(self.engines), thread_name_prefix="ocr-race") \
+            if policy == "race" and len(self.engines) > 1 else None
+
+    def recognize(self, image) -> OcrResult:
+        if self._race_pool:
+            result = self._race(image)
+        else:
+            result = self._in_order(image)
+        with self._lock:
+            self._chosen[result.engine] += 1
+        return result
+
+    def warm(self):
+        for engine in self.engines:
+            engine.warm()
+
+    def stats(self) -> dict:
+        with self._lock:
+            chosen = dict(self._chosen)
+        return {
+            "policy": self.policy,
+            "engines": {e.name: dict(e.stats.snapshot(), chosen=chosen.get(e.name, 0)) for e in self.engines},
+        }
+
+    def _good_enough(self, result: OcrResult) -> bool:
+        return len(result.text) >= self.min_chars and result.confidence >= self.min_confidence
+
+    def _rank(self, result: OcrResult):
+        return (len(result.text) >= self.min_chars, result.confidence, len(result.text))
+
+    def _in_order(self, image) -> OcrResult:
+        engines = self.engines
+        if self.policy == "fastest":
+            # Failures count against an engine, so one that keeps failing goes last, not first
+            engines = sorted(engines, key=lambda e: e.stats.expected_seconds() or 0.0)
+        best, error = None, None
+        for engine in engines:
+            try:
+                result = engine.recognize(image)
+            except Exception as e:
+                error = e
+                continue
+            if self._good_enough(result):
+                return result
+            if best is None or self._rank(result) > self._rank(best):
+                best = result
+        if best is None:
+            raise error
+        return best
+
+    def _race(self, image) -> OcrResult:
+        # PIL images aren't safe to share across threads that convert them; give each engine a copy
+        futures = [self._race_pool.submit(engine.recognize, image.copy()) for engine in self.engines]
+        done, pending = wait(futures, timeout=self.deadline)
+        results = [f.result() for f in done if f.exception() is None]
+        while not results and pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            results = [f.result() for f in done if f.exception() is None]
+        if not results:
+            raise futures[0].exception()
+        return max(results, key=self._rank)
+
+
+def build_router(engine: str = "tesseract", policy: str = "fallback", preprocess=None, **kwargs) -> OcrRouter:
+    """
+    engine: "tesseract", "easyocr" or "both" (EasyOCR first, then tesseract).
+    preprocess: a Preprocessor for every engine (default: the OCR_PREPROCESS steps).
+    """
+    names = ["easyocr", "tesseract"] if engine == "both" else [engine]
+    unknown = [n for n in names if n not in ENGINES]
+    if unknown:
+        raise ValueError(f"Unknown OCR engine {unknown[0]!r}; choose from {sorted(ENGINES)} or 'both'")
+    return OcrRouter([ENGINES[n](preprocess=preprocess) for n in names], policy=policy, **kwargs)
+
+
+_routers = {}
+_routers_lock = threading.Lock()
+
+
+def get_router(engine: str = None, policy: str = None) -> OcrRouter:
+    """
+    The process-wide router for (engine, policy), built on first use (default: OCR_ENGINE, OCR_POLICY).
+    Every caller shares it, e.g. all sessions of a Streamlit app, so its per-engine stats accumulate.
+    """
+    key = (engine or OCR_ENGINE, policy or OCR_POLICY)
+    with _routers_lock:
+        if key not in _routers:
+            _routers[key] = build_router(key[0], policy=key[1])
+        return _routers[key]
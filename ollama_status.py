@@ -0,0 +1,54 @@
+import time
+import threading
+
+import requests
+
+
+def model_available(model: str, installed: list) -> bool:
+    """
+    True if `model` is among the names /api/tags reported; "phi3" matches "phi3:latest".
+    """
+    if ":" not in model:
+        model += ":latest"
+    return model in installed
+
+
+class OllamaProbe:
+    """
+    TTL-cached liveness + installed-models check for one Ollama server.
+
+    status() hits /api/tags at most once per `ttl` seconds no matter how many sessions ask,
+    so the chat request itself is the only round-trip on the hot path. Call invalidate()
+    when a real request fails so the next status() re-probes instead of reporting stale "up".
+    """
+
+    def __init__(self, base_url: str = "http://localhost:11434", ttl: float = 30, timeout: float = 2):
+        self.base_url = base_url.rstrip("/")
+        self.ttl = ttl
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._status = None
+        self._expires_at = 0.0
+
+    def status(self, force: bool = False) -> dict:
+        """
+        {"ok": bool, "models": [names], "error": str or None, "checked_at": epoch seconds}
+        """
+        with self._lock:
+            if force or self._status is None or time.monotonic() >= self._expires_at:
+                self._status = self._probe()
+                self._expires_at = time.monotonic() + self.ttl
+            return self._status
+
+    def invalidate(self):
+        with self._lock:
+            self._expires_at = 0.0
+
+    def _probe(self) -> dict:
+        try:
+            r = requests.get(f"{self.base_url}/api/tags", timeout=self.timeout)
+            r.raise_for_status()
+            models = [m["name"] for m in r.json().get("models", [])]
+            return {"ok": True, "models": models, "error": None, "checked_at": time.time()}
+        except Exception as e:
+            return {"ok": False, "models": [], "error": str(e), "checked_at": time.time()}
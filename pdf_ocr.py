@@ -0,0 +1,30 @@
+from image_preprocess import Preprocessor
+from ocr_engines import TesseractEngine
+
+# Per-page OCR for scanned PDFs; doc_extract.iter_pdf_pages decides which pages need it
+# and schedules them across threads.
+
+# One engine per language, shared by all page threads so their stats add up.
+# Pages are rasterized at a known DPI, so downscaling goes by DPI only (no pixel cap).
+_engines = {}
+
+
+def tesseract_engine(lang: str = "eng") -> TesseractEngine:
+    if lang not in _engines:
+        _engines[lang] = TesseractEngine(lang=lang, preprocess=Preprocessor(max_side=0))
+    return _engines[lang]
+
+
+def ocr_pdf_page(pdf_path: str, page_number: int, dpi: int = 200, poppler_path=None, lang: str = "eng") -> str:
+    """
+    Rasterizes a single page and OCRs it, so only that page's bitmap is ever in memory.
+    """
+    from pdf2image import convert_from_path
+    image = convert_from_path(
+        pdf_path, dpi=dpi, first_page=page_number, last_page=page_number, poppler_path=poppler_path
+    )[0]
+    image.info["dpi"] = (dpi, dpi)
+    try:
+        return tesseract_engine(lang).recognize(image).text
+    finally:
+        image.close()
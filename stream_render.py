@@ -0,0 +1,49 @@
+import time
+
+
+class StreamRenderer:
+    """
+    Batches streamed tokens into display frames for a single Streamlit element.
+
+    Re-rendering the whole reply on every token is O(n²) in reply length. Here the element is
+    redrawn at most once per `interval` seconds (or sooner once `max_chars` new characters are
+    waiting), so the number of redraws depends on generation time, not token count.
+    `render(text, final)` draws the text, e.g. by calling placeholder.markdown().
+    """
+
+    def __init__(self, render, interval: float = 0.1, max_chars: int = 400, clock=time.monotonic):
+        self.render = render
+        self.interval = interval
+        self.max_chars = max_chars
+        self.clock = clock
+        self.frames = 0
+        self._parts = []
+        self._pending_chars = 0
+        self._last_flush = clock()
+
+    @property
+    def text(self) -> str:
+        if len(self._parts) > 1:
+            self._parts = ["".join(self._parts)]
+        return self._parts[0] if self._parts else ""
+
+    def add(self, token: str):
+        if not token:
+            return
+        self._parts.append(token)
+        self._pending_chars += len(token)
+        if self._pending_chars >= self.max_chars or self.clock() - self._last_flush >= self.interval:
+            self._flush(final=False)
+
+    def close(self) -> str:
+        """
+        Draws the final frame and returns the full text.
+        """
+        self._flush(final=True)
+        return self.text
+
+    def _flush(self, final: bool):
+        self.render(self.text, final)
+        self.frames += 1
+        self._pending_chars = 0
+        self._last_flush = self.clock()
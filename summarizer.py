@@ -0,0 +1,176 @@
+import asyncio
+from collections import namedtuple
+
+from context_window import context_budget, estimate_tokens
+from response_cache import request_key
+
+PROMPT_OVERHEAD_TOKENS = 128  # instructions wrapped around each chunk
+
+# One step of a map-reduce summary:
+#   "chunk" - summary of chunk `index` (0-based) of `total`, in completion order
+#             (total is None while the document is still being read)
+#   "final" - the summary of the whole document (always the last event)
+SummaryEvent = namedtuple("SummaryEvent", ["kind", "index", "total", "text"])
+
+
+def chunk_budget(model: str = None) -> int:
+    """
+    Tokens of document text that fit in one summary prompt for `model`.
+    """
+    return max(256, context_budget(model) - PROMPT_OVERHEAD_TOKENS)
+
+
+def document_prompt(text: str) -> str:
+    return f"Summarize the following document clearly and concisely:\n\n{text}"
+
+
+def chunk_prompt(text: str, index: int) -> str:
+    return (
+        f"The following is part {index + 1} of a longer document. Summarize this part clearly and "
+        "concisely, keeping names, numbers, dates and obligations.\n\n" + text
+    )
+
+
+def reduce_prompt(summaries: list) -> str:
+    parts = "".join(f"### Part {i}\n{summary}\n\n" for i, summary in enumerate(summaries, start=1))
+    return (
+        "The following are summaries of consecutive parts of one document. Combine them into a "
+        "single clear, concise summary of the whole document.\n\n" + parts
+    )
+
+
+class MapReduceSummarizer:
+    """
+    Summarizes documents too long for one prompt: the text is split into token-bounded chunks,
+    the chunks are summarized concurrently (at most `parallel` requests at once), and the
+    partial summaries are combined into one - in several rounds if they don't fit together.
+    A document that fits in one chunk costs a single `prompt(text)` request, as before.
+
+    `generate(prompt) -> str` is an async callable that asks the model. `cache` is any object
+    with get(key)/put(key, reply), e.g. a ResponseCache; replies are keyed by
+    request_key(model, prompt=...) so chunk summaries are reused across documents and retries.
+    """
+
+    def __init__(self, generate, model: str = None, chunk_tokens: int = None, parallel: int = 2,
+                 cache=None, prompt=document_prompt):
+        self.generate = generate
+        self.model = model
+        self.chunk_tokens = chunk_tokens or chunk_budget(model)
+        self.parallel = max(1, parallel)
+        self.cache = cache
+        self.prompt = prompt
+
+    def fits(self, text: str) -> bool:
+        return estimate_tokens(text) <= self.chunk_tokens
+
+    async def summarize(self, text, fresh: bool = False) -> str:
+        async for event in self.stream(text, fresh=fresh):
+            if event.kind == "final":
+                return event.text
+
+    async def stream(self, text, fresh: bool = False):
+        """
+        Yields SummaryEvents: a "chunk" event as each chunk summary completes, then "final".
+        `text` is a string or an iterable of pieces (e.g. PDF pages); chunks are dispatched as
+        soon as they're cut, so early pages are being summarized while later ones are read.
+        `fresh` skips cached replies (new ones are still stored).
+        """
+        if isinstance(text, str) and self.fits(text):
+            yield SummaryEvent("final", 0, 1, await self._ask(self.prompt(text), fresh))
+            return
+
+        slots = asyncio.Semaphore(self.parallel)
+        results = asyncio.Queue()  # (index, summary, error); index None = all chunks cut, summary = count
+        chunks, tasks = [], []
+
+        async def summarize_chunk(index):
+            try:
+                async with slots:
+                    results.put_nowait((index, await self._ask(chunk_prompt(chunks[index], index), fresh), None))
+            except Exception as e:
+                results.put_nowait((index, None, e))
+
+        async def dispatch():
+            try:
+                async for chunk in self._chunks(text):
+                    chunks.append(chunk)
+                    # The first chunk waits for a second one: a document that turns out to be a
+                    # single chunk is summarized with the plain prompt instead
+                    if len(chunks) == 2:
+                        tasks.append(asyncio.create_task(summarize_chunk(0)))
+                    if len(chunks) >= 2:
+                        tasks.append(asyncio.create_task(summarize_chunk(len(chunks) - 1)))
+                results.put_nowait((None, len(chunks), None))
+            except Exception as e:
+                results.put_nowait((None, None, e))
+
+        dispatcher = asyncio.create_task(dispatch())
+        try:
+            summaries, total, received = {}, None, 0
+            while total is None or received < total:
+                index, summary, error = await results.get()
+                if error is not None:
+                    raise error
+                if index is None:
+                    total = summary
+                    if total < 2:
+                        final = await self._ask(self.prompt(chunks[0]), fresh) if chunks else ""
+                        yield SummaryEvent("final", 0, 1, final)
+                        return
+                    continue
+                summaries[index] = summary
+                received += 1
+                yield SummaryEvent("chunk", index, total, summary)
+
+            ordered = [summaries[i] or "" for i in range(total)]
+            yield SummaryEvent("final", 0, 1, await self._reduce(ordered, fresh))
+        finally:
+            dispatcher.cancel()
+            for task in tasks:
+                task.cancel()
+
+    async def _chunks(self, text):
+        # Imported here: doc_index also loads numpy for its vectors, which summarizing doesn't need
+        from doc_index import iter_chunks
+
+        # Chunking a string is instant; pieces from a generator are pulled on a thread so
+        # parsing/OCR of later pages doesn't hold up the requests already in flight
+        pieces = iter_chunks([text] if isinstance(text, str) else text, self.chunk_tokens * 4, 0)
+        if isinstance(text, str):
+            for chunk in pieces:
+                yield chunk
+            return
+        while (chunk := await asyncio.to_thread(next, pieces, None)) is not None:
+            yield chunk
+
+    async def _reduce(self, summaries: list, fresh: bool) -> str:
+        slots = asyncio.Semaphore(self.parallel)
+
+        async def combine(group):
+            async with slots:
+                return await self._ask(reduce_prompt(group), fresh)
+
+        # Each round merges token-bounded groups (at least two summaries each) until one prompt holds them all
+        while len(summaries) > 1 and not self.fits(reduce_prompt(summaries)):
+            groups, group, tokens = [], [], 0
+            for summary in summaries:
+                cost = estimate_tokens(summary)
+                if len(group) >= 2 and tokens + cost > self.chunk_tokens:
+                    groups.append(group)
+                    group, tokens = [], 0
+                group.append(summary)
+                tokens += cost
+            groups.append(group)
+            summaries = await asyncio.gather(*[combine(g) if len(g) > 1 else asyncio.sleep(0, g[0]) for g in groups])
+        return await self._ask(reduce_prompt(summaries), fresh)
+
+    async def _ask(self, prompt: str, fresh: bool) -> str:
+        key = request_key(self.model, prompt=prompt)
+        if self.cache is not None and not fresh:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        reply = await self.generate(prompt)
+        if self.cache is not None and reply:
+            self.cache.put(key, reply)
+        return reply